@@ -1,64 +1,270 @@
-from typing import Dict, Any, TYPE_CHECKING
-from utils import roll_dice
+import logging
+import random
+from typing import Dict, Any, Callable, NamedTuple, TYPE_CHECKING
+from utils import get_dice_pool, parse_dice
 
 if TYPE_CHECKING:
     from game_state import GameState
 
+_D20_POOL = get_dice_pool(20)
+
+
+class StatusEffect:
+    __slots__ = ('name', 'duration', 'magnitude')
+
+    def __init__(self, name: str, duration: int, magnitude: int = 0):
+        self.name = name
+        self.duration = duration
+        self.magnitude = magnitude
+
+    @classmethod
+    def from_dict(cls, effect: dict) -> 'StatusEffect':
+        """기존 dict 형식({'name', 'type', 'duration', 'magnitude'})을 StatusEffect로 변환"""
+        name = effect.get('name') or effect.get('type') or 'Effect'
+        return cls(name, effect.get('duration', 1), effect.get('magnitude', effect.get('potency', 0)))
+
+    def __repr__(self):
+        return f"<StatusEffect(name='{self.name}', duration={self.duration}, magnitude={self.magnitude})>"
+
+
+_ROLLERS: dict[tuple[int, int], Callable[[], int]] = {}
+
+def _make_roller(num_dice: int, sides: int) -> Callable[[], int]:
+    """주사위 구성(NdS)별로 특화된 피해 굴림 함수를 반환. 같은 구성은 같은 함수 객체를 공유한다."""
+    roller = _ROLLERS.get((num_dice, sides))
+    if roller is not None:
+        return roller
+    if num_dice <= 0:
+        roller = lambda: 0
+    else:
+        roll = get_dice_pool(sides).next
+        if num_dice == 1:
+            roller = roll
+        elif num_dice == 2:
+            roller = lambda: roll() + roll()
+        else:
+            dice_range = range(num_dice)
+            roller = lambda: sum([roll() for _ in dice_range])
+    _ROLLERS[(num_dice, sides)] = roller
+    return roller
+
+
+_ATTACK_IMPLS: dict[tuple[int, int, int, int], Callable[['Character'], tuple[bool, int]]] = {}
+
+def _make_attack_impl(atk_bonus: int, dmg_bonus: int, num_dice: int, sides: int) -> Callable[['Character'], tuple[bool, int]]:
+    """공격 프로필(명중 보너스, 피해 보정치, NdS)별로 특화된 판정 함수를 반환
+
+    수치를 클로저의 지역 변수로 묶어 두어 공격마다 속성 조회를 하지 않는다. 같은 프로필은 같은 함수를 공유한다.
+    """
+    key = (atk_bonus, dmg_bonus, num_dice, sides)
+    impl = _ATTACK_IMPLS.get(key)
+    if impl is not None:
+        return impl
+    roll_d20 = _D20_POOL.next
+    roll_damage = _make_roller(num_dice, sides)
+
+    def impl(target: 'Character') -> tuple[bool, int]:
+        if roll_d20() + atk_bonus < target.armor_class:
+            return False, 0
+        damage = roll_damage() + dmg_bonus
+        if damage < 0:
+            damage = 0  # 음수 보정치로 대상이 회복되지 않도록 (simulate_attacks와 같은 규칙)
+        new_hp = target.current_hp - damage
+        target.current_hp = new_hp if new_hp > 0 else 0
+        return True, damage
+
+    _ATTACK_IMPLS[key] = impl
+    return impl
+
+
+def resolve_attack(atk_bonus: int, ac: int, dmg_bonus: int, num_dice: int, sides: int, current_hp: int,
+                   rng: random.Random | None = None) -> tuple[int, int, bool]:
+    """정수만으로 공격 한 번을 판정하고 (new_hp, damage, hit)을 반환
+
+    시뮬레이션처럼 공격을 반복 호출하는 루프용 순수 연산 함수. 객체나 문자열을 다루지 않는다.
+    명중한 공격의 피해는 0 미만이 되지 않는다.
+    rng를 넘기면 공유 주사위 풀 대신 그 난수 생성기로 굴리므로, 같은 시드로 전투를 재현할 수 있다.
+    """
+    if rng is None:
+        if _D20_POOL.next() + atk_bonus < ac:
+            return current_hp, 0, False
+        damage = dmg_bonus + _make_roller(num_dice, sides)()
+    else:
+        randint = rng.randint
+        if randint(1, 20) + atk_bonus < ac:
+            return current_hp, 0, False
+        damage = dmg_bonus
+        for _ in range(num_dice):
+            damage += randint(1, sides)
+    if damage < 0:
+        damage = 0
+    new_hp = current_hp - damage
+    return (new_hp if new_hp > 0 else 0), damage, True
+
+
+def simulate_attacks(n: int, atk_bonus: int, dmg_bonus: int, num_dice: int, sides: int, ac: int,
+                     rng: random.Random | None = None) -> tuple[int, int]:
+    """공격 n번을 HP 변화 없이 판정하고 (명중 횟수, 총 피해)를 반환 (밸런스용 몬테카를로 시뮬레이션)
+
+    d20과 피해 주사위를 random.choices로 한꺼번에 굴려 공격당 파이썬 루프를 돌지 않는다.
+    공격 한 번의 피해는 0 미만이 되지 않는다.
+    """
+    choices = (rng or random).choices
+    threshold = ac - atk_bonus
+    hits = sum([1 for roll in choices(range(1, 21), k=n) if roll >= threshold]) if n > 0 else 0
+    if not hits or num_dice <= 0:
+        return hits, hits * dmg_bonus if dmg_bonus > 0 else 0
+    dice = choices(range(1, sides + 1), k=hits * num_dice)
+    if dmg_bonus >= 0:
+        return hits, sum(dice) + hits * dmg_bonus
+    # 보정치가 음수면 공격마다 0으로 잘라야 하므로 공격 단위로 합산
+    return hits, sum([max(0, sum(dice[i:i + num_dice]) + dmg_bonus) for i in range(0, len(dice), num_dice)])
+
+
+class AttackEvent(NamedTuple):
+    """공격 한 번의 결과. 메시지 문자열은 str()로 표시할 때만 만든다.
+
+    attack()이 문자열을 반환하던 시절의 호출자를 위해 `"attacks" in event`는 메시지 문자열에서 찾는다.
+    """
+    attacker: str
+    target: str
+    hit: bool
+    damage: int
+
+    def __str__(self) -> str:
+        if self.hit:
+            return f"{self.attacker} attacks {self.target} for {self.damage} damage."
+        return f"{self.attacker}'s attack misses {self.target}."
+
+    def __contains__(self, text: object) -> bool:
+        return isinstance(text, str) and text in str(self)
+
 class Character:
+    """전투에 참여하는 캐릭터의 기본 클래스
+
+    combat_stats는 생성 시점의 메타데이터로만 사용한다. 전투 수치(attack_bonus 등)는 __init__에서
+    한 번 꺼내 두므로, 생성 후 combat_stats를 수정해도 판정에는 반영되지 않는다.
+    """
+    __slots__ = ('id', 'name', 'max_hp', 'current_hp', 'combat_stats',
+                 'attack_bonus', 'damage_bonus', 'armor_class',
+                 'base_damage_dice', '_num_dice', '_dice_sides', '_dice_modifier',
+                 '_attack_impl', 'status_effects')
+
     def __init__(self, id: str, name: str, max_hp: int, combat_stats: Dict[str, Any], base_damage_dice: str):
         self.id = id
         self.name = name
         self.max_hp = max_hp
         self.current_hp = max_hp
         self.combat_stats = combat_stats
+        # 전투 판정에 쓰이는 수치는 생성 시 한 번만 꺼내 둔다 (공격마다 dict 조회를 하지 않도록)
+        self.attack_bonus: int = int(combat_stats.get('attack_bonus', 0))
+        self.damage_bonus: int = int(combat_stats.get('damage_bonus', 0))
+        self.armor_class: int = int(combat_stats.get('armor_class', 10))
         self.base_damage_dice = base_damage_dice
-        self.status_effects = []
+        self._num_dice, self._dice_sides, self._dice_modifier = self._parse_damage_dice(base_damage_dice)
+        self._attack_impl = _make_attack_impl(self.attack_bonus, self.damage_bonus + self._dice_modifier,
+                                              self._num_dice, self._dice_sides)
+        self.status_effects: dict[str, StatusEffect] = {}  # 효과 이름 -> 효과
+
+    def _parse_damage_dice(self, dice_str: str) -> tuple[int, int, int]:
+        """피해 주사위 표기(예: "2d6", "1d10+2")를 (개수, 면 수, 보정치)로 한 번만 파싱"""
+        try:
+            return parse_dice(dice_str)
+        except (TypeError, ValueError) as e:
+            logging.warning(f"Character {self.id}: invalid base_damage_dice '{dice_str}' ({e}). Damage dice disabled.")
+            return 0, 0, 0
 
     def is_alive(self) -> bool:
         return self.current_hp > 0
 
     def take_damage(self, amount: int):
-        self.current_hp -= amount
-        if self.current_hp < 0:
-            self.current_hp = 0
+        new_hp = self.current_hp - amount
+        self.current_hp = new_hp if new_hp > 0 else 0
+
+    def take_damage_and_check(self, amount: int) -> bool:
+        """피해를 적용하고 생존 여부를 반환 (take_damage() 후 is_alive() 호출을 하나로 합침)"""
+        new_hp = self.current_hp - amount
+        self.current_hp = new_hp if new_hp > 0 else 0
+        return new_hp > 0
 
     def heal(self, amount: int):
         """HP 회복"""
         self.current_hp = min(self.current_hp + amount, self.max_hp)
 
-    def apply_status_effect(self, effect: dict):
-        """상태 효과 적용"""
-        self.status_effects.append(effect)
+    def apply_status_effect(self, effect: 'StatusEffect | dict'):
+        """상태 효과 적용 (dict 형식은 StatusEffect로 변환, 같은 이름의 효과는 교체)"""
+        if not isinstance(effect, StatusEffect):
+            effect = StatusEffect.from_dict(effect)
+        self.status_effects[effect.name] = effect
+
+    def add_status_effect(self, effect_name: str, duration: int, potency: int = 0) -> str:
+        """이름으로 상태 효과 추가. 이미 걸려 있으면 지속 시간과 강도만 갱신"""
+        effect = self.status_effects.get(effect_name)
+        if effect is not None:
+            effect.duration = duration
+            effect.magnitude = potency
+            return f"{effect_name} on {self.name} is refreshed ({duration} turns)."
+        self.status_effects[effect_name] = StatusEffect(effect_name, duration, potency)
+        return f"{self.name} is affected by {effect_name} ({duration} turns)."
+
+    def remove_status_effect(self, effect_name: str) -> bool:
+        """상태 효과 제거. 제거했으면 True"""
+        return self.status_effects.pop(effect_name, None) is not None
 
     def tick_status_effects(self) -> list[str]:
-        """상태 효과 처리"""
+        """상태 효과 처리 (지속 시간을 줄이고 만료된 효과를 제거)"""
+        effects = self.status_effects
+        if not effects:
+            return []  # 대부분의 전투원은 효과가 없으므로 바로 반환
         messages = []
-        effects_to_remove = []
-        
-        for effect in self.status_effects:
+        for effect in list(effects.values()):
             # 효과 처리 로직
-            effect['duration'] -= 1
-            if effect['duration'] <= 0:
-                effects_to_remove.append(effect)
-        
-        for effect in effects_to_remove:
-            self.status_effects.remove(effect)
-        
+            effect.duration -= 1
+            if effect.duration <= 0:
+                del effects[effect.name]
         return messages
 
-    def attack(self, target: 'Character') -> str:
-        # Simple attack logic, can be expanded
-        attack_roll = roll_dice(20) + self.combat_stats.get('attack_bonus', 0)
-        armor_class = target.combat_stats.get('armor_class', 10)
-
-        if attack_roll >= armor_class:
-            # Parse dice notation (e.g., "2d6" -> num_dice=2, dice_sides=6)
-            dice_parts = self.base_damage_dice.split('d')
-            num_dice = int(dice_parts[0])
-            dice_sides = int(dice_parts[1])
-            dmg_roll = roll_dice(sides=dice_sides, num_dice=num_dice)
-            damage = dmg_roll + self.combat_stats.get('damage_bonus', 0)
-            target.take_damage(damage)
-            return f"{self.name} attacks {target.name} for {damage} damage."
-        else:
-            return f"{self.name}'s attack misses {target.name}."
\ No newline at end of file
+    def attack(self, target: 'Character', rng: random.Random | None = None) -> AttackEvent:
+        # 판정은 fast_attack()에서 하고, 메시지가 필요한 호출자만 str(event)로 문자열을 만든다
+        hit, damage = self.fast_attack(target, rng)
+        return AttackEvent(self.name, target.name, hit, damage)
+
+    def fast_attack(self, target: 'Character', rng: random.Random | None = None) -> tuple[bool, int]:
+        """메시지 없이 공격을 판정하고 (hit, damage)를 반환 (rng는 전투별 시드 고정용)"""
+        if rng is not None:
+            target.current_hp, damage, hit = resolve_attack(
+                self.attack_bonus, target.armor_class, self.damage_bonus + self._dice_modifier,
+                self._num_dice, self._dice_sides, target.current_hp, rng)
+            return hit, damage
+        return self._attack_impl(target)
+
+    def simulate_attacks(self, target: 'Character', n: int = 10000,
+                         rng: random.Random | None = None) -> tuple[int, int]:
+        """target을 n번 공격했을 때의 (명중 횟수, 총 피해)를 시뮬레이션. 실제 HP는 바뀌지 않는다."""
+        return simulate_attacks(n, self.attack_bonus, self.damage_bonus + self._dice_modifier,
+                                self._num_dice, self._dice_sides, target.armor_class, rng)
+
+    @staticmethod
+    def apply_damage_batch(targets: list['Character'], amounts: list[int]) -> None:
+        """여러 대상에게 피해를 한 번에 적용 (같은 대상이 여러 번 나오면 누적)"""
+        for target, amount in zip(targets, amounts):
+            new_hp = target.current_hp - amount
+            target.current_hp = new_hp if new_hp > 0 else 0
+
+    @classmethod
+    def batch_attack(cls, attackers: list['Character'], targets: list['Character'],
+                     rng: random.Random | None = None) -> list[AttackEvent]:
+        """여러 공격을 한 번에 처리 (attackers[i]가 targets[i]를 공격)
+
+        라운드의 모든 명중/피해를 먼저 판정한 뒤 apply_damage_batch()로 피해를 한 번에 적용하므로
+        같은 라운드 안의 공격은 동시에 일어난 것으로 취급된다. 결과는 attack()과 같은 AttackEvent 목록이다.
+        """
+        if len(attackers) != len(targets):
+            raise ValueError("attackers and targets must have the same length.")
+        results = [resolve_attack(attacker.attack_bonus, target.armor_class,
+                                  attacker.damage_bonus + attacker._dice_modifier,
+                                  attacker._num_dice, attacker._dice_sides, target.current_hp, rng)
+                   for attacker, target in zip(attackers, targets)]
+        cls.apply_damage_batch(targets, [damage for _, damage, _ in results])
+        return [AttackEvent(attacker.name, target.name, hit, damage)
+                for attacker, target, (_, damage, hit) in zip(attackers, targets, results)]
@@ -1,19 +1,55 @@
 
+import logging
 import re
-from game_state import PlayerState, Player, NPC, Character, determine_initiative
+from game_state import PlayerState, Player, NPC, Character, roll_initiative
+
+_CAST_RE = re.compile(r"(.+?)(?:\s+on\s+(.+))?$", re.IGNORECASE) # "<spell name> [on <target name>]"
+
 
 def notify_dm_event(dm_manager, message: str):
     """Sends a formatted game event message to the DM."""
     if not message: # Do not send empty messages
         return
+    send = getattr(dm_manager, 'send_message', None) if dm_manager else None # Looked up per call so a replaced send_message is honoured
     try:
-        # Make sure dm_manager is not None and has send_message
-        if dm_manager and hasattr(dm_manager, 'send_message'):
-            dm_manager.send_message(f"Game Event: {message}", stream=False)
+        if send is not None:
+            send(f"Game Event: {message}", stream=False)
         else:
-            print(f"LOG: DM Manager not available. Event: {message}") # Fallback log
+            logging.debug("DM Manager not available. Event: %s", message) # Formatted only if DEBUG is enabled
     except Exception as e:
-        print(f"LOG: Error sending DM notification: {e}. Event: {message}") # Fallback log
+        logging.warning("Error sending DM notification: %s. Event: %s", e, message)
+
+
+def _find_live_participant(current_player_state: PlayerState, target_name: str) -> Character | None:
+    """Finds a living combatant by case-insensitive name, preferring the first one in participant order."""
+    name_key = target_name.lower()
+    target = current_player_state.participants_by_lower_name.get(name_key)
+    if target is None or target.is_alive():
+        return target
+    # The indexed combatant with this name is down; another living one may share the name
+    return next((p for p in current_player_state.participants_in_combat
+                 if p.is_alive() and p.name.lower() == name_key), None)
+
+
+def _fmt(parts: list[str]) -> str:
+    """Joins turn messages with newlines, skipping the join for the common single-message turn."""
+    return parts[0] if len(parts) == 1 else "\n".join(parts)
+
+
+def _advance_turn(current_player_state: PlayerState, char_id: str) -> str:
+    """
+    Moves the turn cursor past char_id and returns the id of the character whose turn is next.
+    Raises ValueError if char_id is not in the turn order.
+    """
+    turn_order = current_player_state.turn_order
+    current_turn_index = current_player_state.current_turn_index
+    if current_turn_index >= len(turn_order) or turn_order[current_turn_index] != char_id:
+        # Cursor out of sync (e.g. current_turn_character_id was set directly); resync with one scan
+        current_turn_index = turn_order.index(char_id)
+    next_turn_index = (current_turn_index + 1) % len(turn_order)
+    current_player_state.current_turn_index = next_turn_index
+    current_player_state.current_turn_character_id = turn_order[next_turn_index]
+    return current_player_state.current_turn_character_id
 
 
 def start_combat(player: Player, npcs: list[NPC], current_player_state: PlayerState) -> str:
@@ -30,34 +66,93 @@ def start_combat(player: Player, npcs: list[NPC], current_player_state: PlayerSt
     current_player_state.is_in_combat = True
     all_participants: list[Character] = [player] + npcs
     current_player_state.participants_in_combat = all_participants # Store actual objects
+    participants_by_id = {p.id: p for p in all_participants}
+    current_player_state.participants_by_id = participants_by_id
+    participants_by_lower_name = {}
+    for p in all_participants:
+        participants_by_lower_name.setdefault(p.name.lower(), p) # First combatant wins on duplicate names
+    current_player_state.participants_by_lower_name = participants_by_lower_name
 
-    current_player_state.turn_order = determine_initiative(all_participants) # Expects list of objects
+    ordered_participants = roll_initiative(all_participants)
+    current_player_state.turn_order = [p.id for p in ordered_participants]
 
     if not current_player_state.turn_order:
         current_player_state.is_in_combat = False
         # Reset participants if combat fails to start
         current_player_state.participants_in_combat = []
+        current_player_state.participants_by_id = {}
+        current_player_state.participants_by_lower_name = {}
         return "Combat could not start: no participants or failed initiative determination."
 
     current_player_state.current_turn_character_id = current_player_state.turn_order[0]
+    current_player_state.current_turn_index = 0
 
-    # Get names for the turn order string
-    turn_order_names = []
-    for char_id in current_player_state.turn_order:
-        participant = next((p for p in all_participants if p.id == char_id), None)
-        if participant:
-            turn_order_names.append(participant.name)
-        else:
-            turn_order_names.append(f"Unknown({char_id})")
+    turn_order_str = ", ".join([p.name for p in ordered_participants])
+    first_character_name = ordered_participants[0].name
 
+    return f"Combat started! Turn order: {turn_order_str}. First up: {first_character_name} ({current_player_state.current_turn_character_id})."
 
-    turn_order_str = ", ".join(turn_order_names)
-    first_character_name = "Unknown"
-    first_char_obj = next((p for p in all_participants if p.id == current_player_state.current_turn_character_id), None)
-    if first_char_obj:
-        first_character_name = first_char_obj.name
 
-    return f"Combat started! Turn order: {turn_order_str}. First up: {first_character_name} ({current_player_state.current_turn_character_id})."
+# --- Player command handlers ---
+# Each returns (message, turn_consumed). When turn_consumed is False the message is returned to the player as-is
+# and the turn does not advance.
+
+def _cmd_attack(attacker: Player, action_parts: list[str], player_action: str,
+                current_player_state: PlayerState, dm_manager) -> tuple[str, bool]:
+    if len(action_parts) < 2:
+        return "Invalid action. Usage: attack <target_name>", False
+    target_name = action_parts[1]
+    target = _find_live_participant(current_player_state, target_name)
+    if not target:
+        # This is UI feedback if target is not found.
+        return f"Target '{target_name}' not found, is not alive, or is invalid.", False
+    if target == attacker:
+        return f"{attacker.name} wisely decides not to attack themselves.", True # Still consumes the turn
+    attack_event = attacker.attack(target) # This is a DM message part
+    action_message_segment = str(attack_event) # Store for player feedback
+    if attack_event.hit: # Only actual hits are reported to the DM
+        notify_dm_event(dm_manager, action_message_segment)
+    return action_message_segment, True
+
+
+def _cmd_cast(attacker: Player, action_parts: list[str], player_action: str,
+              current_player_state: PlayerState, dm_manager) -> tuple[str, bool]:
+    if len(action_parts) < 2:
+        return "Invalid command. Usage: cast <spell_name> [on <target_name>]", False
+
+    spell_and_target_str = player_action.split(None, 1)[1] # Everything after "cast"
+    # Target name is optional and follows " on ". Spell names can have spaces.
+    match = _CAST_RE.match(spell_and_target_str)
+    if not match:
+        # This regex should almost always match if spell_and_target_str is not empty.
+        return "Invalid cast command format. Usage: cast <spell_name> [on <target_name>]", False
+
+    spell_name_str = match.group(1).strip().title() # .title() to match SPELLBOOK keys
+    target_name = match.group(2).strip() if match.group(2) else None
+
+    target_object = None
+    if target_name:
+        target_object = _find_live_participant(current_player_state, target_name)
+        if not target_object:
+            return f"Target '{target_name}' not found or is not alive.", False
+
+    # Attacker is the player character, who has the cast_spell method
+    success, message = attacker.cast_spell(spell_name_str, current_player_state, target_object)
+    if not success:
+        # Error message from cast_spell (e.g., "Spell not found", "No slots"); no turn advancement
+        return message, False
+    notify_dm_event(dm_manager, message) # Send full spell outcome to DM
+    return message, True
+
+
+def _cmd_pass(attacker: Player, action_parts: list[str], player_action: str,
+              current_player_state: PlayerState, dm_manager) -> tuple[str, bool]:
+    action_message_segment = f"{attacker.name} passes their turn."
+    notify_dm_event(dm_manager, action_message_segment) # Notify DM about passing
+    return action_message_segment, True
+
+
+_COMMAND_DISPATCH = {"attack": _cmd_attack, "cast": _cmd_cast, "pass": _cmd_pass}
 
 
 def process_combat_turn(dm_manager, current_player_state: PlayerState, player_action: str = "") -> str:
@@ -72,16 +167,14 @@ def process_combat_turn(dm_manager, current_player_state: PlayerState, player_ac
         return "Cannot process turn: current_turn_character_id is not set."
 
     char_id = current_player_state.current_turn_character_id
-    attacker = next((p for p in current_player_state.participants_in_combat if p.id == char_id), None)
+    participants_by_id = current_player_state.participants_by_id
+    attacker = participants_by_id.get(char_id)
 
     if attacker is None:
         # This should ideally not happen if char_id is always valid.
         # If it does, try to advance turn to prevent getting stuck.
         try:
-            current_turn_index = current_player_state.turn_order.index(char_id) # This will fail if char_id is bad
-            next_turn_index = (current_turn_index + 1) % len(current_player_state.turn_order)
-            current_player_state.current_turn_character_id = current_player_state.turn_order[next_turn_index]
-            next_attacker_obj = next((p for p in current_player_state.participants_in_combat if p.id == current_player_state.current_turn_character_id), None)
+            next_attacker_obj = participants_by_id.get(_advance_turn(current_player_state, char_id)) # This will fail if char_id is bad
             next_attacker_name = next_attacker_obj.name if next_attacker_obj else "Unknown"
             return f"Error: Attacker with ID {char_id} not found. Advancing to {next_attacker_name} to prevent stall."
         except (ValueError, IndexError) as e:
@@ -89,6 +182,7 @@ def process_combat_turn(dm_manager, current_player_state: PlayerState, player_ac
             current_player_state.is_in_combat = False # Attempt to stop combat
             return f"Critical Error: Attacker {char_id} not found and cannot advance turn: {e}. Combat stopped."
 
+    attacker_name = attacker.name
     notification_parts = [] # Accumulate messages for the turn
 
     # --- Status Effects Tick ---
@@ -100,133 +194,56 @@ def process_combat_turn(dm_manager, current_player_state: PlayerState, player_ac
         # is_attacker_alive_after_effects = attacker.is_alive() # This variable is not used later, can be removed if not needed
 
     if not attacker.is_alive():
-        # Character died from status effects (e.g., poison)
+        # Character died from status effects (e.g., poison) or was already defeated before their turn
         # notification_parts already contains death messages from tick_status_effects
         # Advance turn
         try:
-            current_turn_index = current_player_state.turn_order.index(char_id)
-            next_turn_index = (current_turn_index + 1) % len(current_player_state.turn_order)
-            current_player_state.current_turn_character_id = current_player_state.turn_order[next_turn_index]
-            next_attacker_obj = next((p for p in current_player_state.participants_in_combat if p.id == current_player_state.current_turn_character_id), None)
+            next_attacker_obj = participants_by_id.get(_advance_turn(current_player_state, char_id))
             next_attacker_name = next_attacker_obj.name if next_attacker_obj else "Unknown"
-            notification_parts.append(f"{attacker.name} cannot take further actions this turn. Advancing to {next_attacker_name}.")
-            return "\n".join(notification_parts)
+            notification_parts.append(f"{attacker_name} cannot take further actions this turn. Advancing to {next_attacker_name}.")
+            return _fmt(notification_parts)
         except (ValueError, IndexError) as e:
             # If advancing fails, combat state is critically corrupted.
             current_player_state.is_in_combat = False # Attempt to stop combat
             notification_parts.append(f"Error advancing turn after character succumbed to status effects: {e}. Combat stopped.")
-            return "\n".join(notification_parts)
-
-    # Original check for already defeated characters (e.g. by AoE before their turn)
-    # This might be redundant if status effects kill them, but good as a fallback.
-    if not attacker.is_alive(): # Re-check, though tick_status_effects should handle this.
-        try:
-            current_turn_index = current_player_state.turn_order.index(char_id)
-            next_turn_index = (current_turn_index + 1) % len(current_player_state.turn_order)
-            current_player_state.current_turn_character_id = current_player_state.turn_order[next_turn_index]
-            next_attacker_obj = next((p for p in current_player_state.participants_in_combat if p.id == current_player_state.current_turn_character_id), None)
-            next_attacker_name = next_attacker_obj.name if next_attacker_obj else "Unknown"
-            notification_parts.append(f"{attacker.name} was already defeated. Advancing to {next_attacker_name}.")
-            return "\n".join(notification_parts)
-        except (ValueError, IndexError) as e:
-            current_player_state.is_in_combat = False
-            notification_parts.append(f"Error advancing turn for already defeated character: {e}. Combat stopped.")
-            return "\n".join(notification_parts)
+            return _fmt(notification_parts)
 
     turn_advanced = False
     action_message_segment = "" # To be added to notification_parts
 
     if isinstance(attacker, Player):
         if not player_action:
-            action_message_segment = f"It is your turn, {attacker.name}. What do you do? (Type 'attack <target>', 'cast <spell> [on <target>]', or 'pass')"
+            action_message_segment = f"It is your turn, {attacker_name}. What do you do? (Type 'attack <target>', 'cast <spell> [on <target>]', or 'pass')"
             turn_advanced = False # Pending player input
         else:
             # Process player command
-            command_parts = player_action.lower().split()
-            command = command_parts[0]
-            action_parts = player_action.split() # Keep original case for names if needed, though we use lower for matching
-
-            if command == "attack":
-                if len(action_parts) < 2:
-                    return "Invalid action. Usage: attack <target_name>"
-                target_name = action_parts[1]
-                target = next((p for p in current_player_state.participants_in_combat
-                               if p.name.lower() == target_name.lower() and p.is_alive()), None)
-                if target:
-                    if target == attacker:
-                        action_message_segment = f"{attacker.name} wisely decides not to attack themselves."
-                    else:
-                        attack_notification = attacker.attack(target) # This is a DM message part
-                        action_message_segment = attack_notification # Store for player feedback
-                        if attack_notification and "attacks" in attack_notification: # Check if it's an actual attack message
-                            notify_dm_event(dm_manager, attack_notification)
-                else:
-                    # This is UI feedback if target is not found.
-                    return f"Target '{target_name}' not found, is not alive, or is invalid."
-                turn_advanced = True # Attack action consumes the turn
-            elif command == "cast":
-                if len(action_parts) < 2:
-                    return "Invalid command. Usage: cast <spell_name> [on <target_name>]"
-
-                spell_and_target_str = action_parts[1]
-                # spell_name_str needs to be extracted carefully.
-                # Target name is optional and follows " on ".
-                # Spell names can have spaces.
-
-                match = re.match(r"(.+?)(?:\s+on\s+(.+))?$", spell_and_target_str, re.IGNORECASE)
-
-                if not match:
-                    # This regex should almost always match if action_parts[1] is not empty.
-                    # This case might occur if spell_and_target_str is empty or malformed in an unexpected way.
-                    return "Invalid cast command format. Usage: cast <spell_name> [on <target_name>]"
-
-                spell_name_str = match.group(1).strip().title() # .title() to match SPELLBOOK keys
-                target_name = None
-                if match.group(2):
-                    target_name = match.group(2).strip()
-
-                target_object = None
-                if target_name:
-                    # Find the target in participants_in_combat
-                    target = next((p for p in current_player_state.participants_in_combat
-                                   if p.name.lower() == target_name.lower() and p.is_alive()), None)
-                    if not target:
-                        return f"Target '{target_name}' not found or is not alive."
-                    target_object = target
-
-                # Attacker is the player character, who has the cast_spell method
-                success, message = attacker.cast_spell(spell_name_str, target_object)
-
-                if success:
-                    notify_dm_event(dm_manager, message) # Send full spell outcome to DM
-                    action_message_segment = message # This will be part of player UI feedback
-                    turn_advanced = True
-                else:
-                    return message # Return error message from cast_spell (e.g., "Spell not found", "No slots")
-                    # No turn advancement on failed cast due to bad input/unavailable resources
-
-            elif command == "pass":
-                action_message_segment = f"{attacker.name} passes their turn."
-                notify_dm_event(dm_manager, action_message_segment) # Notify DM about passing
-                turn_advanced = True
-            else:
+            action_parts = player_action.split() # Keep original case for names; only the command word is lowercased
+            if not action_parts:
+                return "Invalid action: empty command. Type 'attack <target_name>', 'cast <spell_name> [on <target_name>]', or 'pass'."
+            command = action_parts[0].lower()
+
+            handler = _COMMAND_DISPATCH.get(command)
+            if handler is None:
                 # This is UI feedback for invalid command.
                 return f"Invalid action: '{player_action}'. Type 'attack <target_name>', 'cast <spell_name> [on <target_name>]', or 'pass'."
                 # For invalid actions, we don't advance the turn, player gets another try.
+            action_message_segment, turn_advanced = handler(attacker, action_parts, player_action, current_player_state, dm_manager)
+            if not turn_advanced:
+                return action_message_segment # Usage/target errors: player gets another try
 
     else: # NPC's turn
         # Simple AI: Attack the player character if alive
         target = current_player_state.player_character
         if target and target.is_alive():
-            attack_notification = attacker.attack(target) # DM message part
-            action_message_segment = attack_notification # Store for player feedback
-            if attack_notification and "attacks" in attack_notification: # Check if it's an actual attack message
-                 notify_dm_event(dm_manager, attack_notification)
+            attack_event = attacker.attack(target) # DM message part
+            action_message_segment = str(attack_event) # Store for player feedback
+            if attack_event.hit: # Only actual hits are reported to the DM
+                 notify_dm_event(dm_manager, action_message_segment)
         elif target and not target.is_alive():
-            action_message_segment = f"{attacker.name} sees the player {target.name} is defeated and looks for other targets (but finds none)." # DM message part
+            action_message_segment = f"{attacker_name} sees the player {target.name} is defeated and looks for other targets (but finds none)." # DM message part
             # In a more complex scenario, NPC might choose another NPC or take other actions.
         else: # Should not happen if player_character is always set in PlayerState
-             action_message_segment = f"{attacker.name} is confused and has no target." # DM message part
+             action_message_segment = f"{attacker_name} is confused and has no target." # DM message part
         turn_advanced = True # NPC turn always results in an action or attempted action
 
     if action_message_segment:
@@ -235,15 +252,13 @@ def process_combat_turn(dm_manager, current_player_state: PlayerState, player_ac
     # Advance turn if an action was taken or turn was passed
     if turn_advanced:
         try:
-            current_turn_index = current_player_state.turn_order.index(char_id)
-            next_turn_index = (current_turn_index + 1) % len(current_player_state.turn_order)
-            current_player_state.current_turn_character_id = current_player_state.turn_order[next_turn_index]
+            next_char_id = _advance_turn(current_player_state, char_id)
 
-            next_attacker_obj = next((p for p in current_player_state.participants_in_combat if p.id == current_player_state.current_turn_character_id), None)
+            next_attacker_obj = participants_by_id.get(next_char_id)
             if next_attacker_obj:
                  notification_parts.append(f"Next up: {next_attacker_obj.name}.")
             else: # Should ideally not happen if turn_order IDs are valid
-                notification_parts.append(f"Next up: ID {current_player_state.current_turn_character_id} (name unknown).")
+                notification_parts.append(f"Next up: ID {next_char_id} (name unknown).")
 
         except ValueError:
             notification_parts.append(f"Error: Character {char_id} not found in turn order. Combat state might be corrupted.")
@@ -252,7 +267,7 @@ def process_combat_turn(dm_manager, current_player_state: PlayerState, player_ac
             notification_parts.append(f"Error: Problem advancing turn. Combat state might be corrupted.")
             current_player_state.is_in_combat = False # Attempt to stop combat
 
-    return "\n".join(notification_parts)
+    return _fmt(notification_parts)
 
 
 def check_combat_end_condition(player: Player, npcs: list[NPC], current_player_state: PlayerState) -> tuple[bool, str]:
@@ -263,11 +278,13 @@ def check_combat_end_condition(player: Player, npcs: list[NPC], current_player_s
     if not current_player_state.is_in_combat:
         return (not current_player_state.is_in_combat, "") # Already ended
 
-    if not isinstance(player, Player) or not all(isinstance(npc, NPC) for npc in npcs):
+    # start_combat already validated these types; re-check only in debug runs (skipped under python -O)
+    if __debug__ and (not isinstance(player, Player) or not all(isinstance(npc, NPC) for npc in npcs)):
         # This indicates a programming error if wrong types are passed.
         return (False, "Error: Type mismatch in check_combat_end_condition arguments.")
 
     player_defeated = not player.is_alive()
+    # Checked from the NPCs themselves: HP also changes outside process_combat_turn (batch_attack, direct attack() calls)
     all_npcs_defeated = bool(npcs) and all(not npc.is_alive() for npc in npcs)
 
     end_condition_met = False
@@ -283,8 +300,11 @@ def check_combat_end_condition(player: Player, npcs: list[NPC], current_player_s
     if end_condition_met:
         current_player_state.is_in_combat = False
         current_player_state.participants_in_combat = [] # Clear participants list
+        current_player_state.participants_by_id = {}
+        current_player_state.participants_by_lower_name = {}
         current_player_state.current_turn_character_id = None
         current_player_state.turn_order = []
+        current_player_state.current_turn_index = 0
         return (True, notification)
 
     return (False, "")
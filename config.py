@@ -14,7 +14,8 @@ EMBEDDING_MODEL_NAME = 'all-MiniLM-L6-v2' # Standard sentence transformer model
 VECTOR_DB_PATH = "./chroma_db" # Path to store ChromaDB persistent data
 COLLECTION_NAME = "dnd_game_content" # Name of the collection in ChromaDB
 
-RAG_DOCUMENT_SOURCES = [
+# Sequences below are tuples so every importer shares one immutable object
+RAG_DOCUMENT_SOURCES = (
     './data/NPCs',
     './data/Items', # Added Items
     './data/Regions', # Was already present
@@ -28,11 +29,11 @@ RAG_DOCUMENT_SOURCES = [
     './data/RaceTemplates',
     './data/AttributeTraits',
     './data/RoleTemplates'
-]
+)
 
 # Fields to extract text from for RAG embedding.
 # 'dialogue_responses' will be handled specially in get_text_from_doc to extract npc_text from nodes.
-RAG_TEXT_FIELDS = [
+RAG_TEXT_FIELDS = (
     'name',
     'description',
     'text_content', # Primarily for .txt files and specific JSON fields like in Lore/History
@@ -41,7 +42,7 @@ RAG_TEXT_FIELDS = [
     # e.g., 'effects.description' if items had detailed effect descriptions,
     # 'exits.description' if exits had descriptive text.
     # For now, keeping it to common and clearly structured text fields.
-]
+)
 
 RAG_DOCUMENT_FILTERS = {} # Placeholder for potential future filtering logic
 
@@ -73,7 +74,7 @@ HERO_DEFAULT_DATA = {
 # Other
 INITIAL_PROMPT_TEXT = "당신은 Dungeons & Dragons 5판 게임의 숙련된 던전 마스터입니다. 플레이어의 첫 행동을 기다리는 상황을 가정하고, 모험의 시작을 알리는 흥미로운 도입부를 묘사해주세요."
 
-PRESET_SCENARIOS = [
+PRESET_SCENARIOS = (
     {
         "id": "goblin_cave_escape",
         "name": "Escape from the Goblin Cave",
@@ -93,6 +94,6 @@ PRESET_SCENARIOS = [
         "initial_prompt": INITIAL_PROMPT_TEXT,
         "start_location_id": "default_start_location"
     }
-]
+)
 
-USER_EXIT_COMMANDS = ["그만", "종료", "exit"]
+USER_EXIT_COMMANDS = frozenset({"그만", "종료", "exit"}) # Checked with `in`
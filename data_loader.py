@@ -1,8 +1,21 @@
 import os
+import sys
 import json
 import typing
 import logging
-from typing import Any
+import mmap
+import operator
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+# orjson parses UTF-8 bytes directly and is several times faster on the dict-heavy data files.
+# It is optional: without it the stdlib parser is used and behaviour is the same.
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -10,14 +23,139 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 if typing.TYPE_CHECKING:
     from game_state import NPC # For type hinting
 
-def load_raw_data_from_sources(document_sources: list[str]) -> dict[str, list[dict[str, Any] | list[Any]]]:
+_MAX_READ_WORKERS = 32 # File reads are I/O-bound; more threads than this stop helping
+_READ_CHUNK_SIZE = 64 * 1024
+_MMAP_MIN_SIZE = 64 * 1024 # Below this a plain read() is cheaper than setting up a mapping
+
+# path -> (st_mtime_ns, st_size, parsed file content); only used by load_raw_data_from_sources(use_cache=True).
+# Keyed by path alone so a changed file replaces its own entry instead of leaving the old parse behind.
+_PARSE_CACHE: dict[str, tuple[int, int, Any]] = {}
+
+def clear_parse_cache() -> None:
+    """Drops every parsed file kept by load_raw_data_from_sources(use_cache=True)."""
+    _PARSE_CACHE.clear()
+
+def _read_file_bytes(filepath: str) -> bytes | mmap.mmap:
+    """
+    Reads a file's raw bytes. Runs on loader worker threads, so it does no decoding or parsing.
+    Uses the fd directly (no buffered file object) and sizes the read from fstat, so a
+    regular file is normally read with a single read() call.
+    Large JSON files are memory-mapped instead when orjson is available, since orjson can
+    parse straight from the mapping; _loads_json_bytes closes the mapping after parsing.
+    """
+    fd = os.open(filepath, os.O_RDONLY | getattr(os, "O_BINARY", 0)) # O_BINARY only exists (and matters) on Windows
+    try:
+        size = os.fstat(fd).st_size
+        if size >= _MMAP_MIN_SIZE and ORJSON_AVAILABLE and filepath.endswith(".json"):
+            return mmap.mmap(fd, size, access=mmap.ACCESS_READ) # The mapping stays valid after the fd is closed
+        data = os.read(fd, size + 1) # One byte extra, so a file that grew after fstat is noticed
+        if len(data) == size:
+            return data
+        parts = [data]
+        while chunk := os.read(fd, _READ_CHUNK_SIZE):
+            parts.append(chunk)
+        return b"".join(parts)
+    finally:
+        os.close(fd)
+
+def _file_stamp(entry: os.DirEntry) -> tuple[int, int] | None:
+    """Returns (st_mtime_ns, st_size) for a directory entry, as checked against _PARSE_CACHE, or None if it cannot be stat'ed."""
+    try:
+        st = entry.stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+def _get_cached_parse(filepath: str, stamp: tuple[int, int]) -> Any | None:
+    """Returns the cached parse of filepath if it was made from a file with the same stamp, otherwise None."""
+    hit = _PARSE_CACHE.get(filepath)
+    if hit is None or hit[0] != stamp[0] or hit[1] != stamp[1]:
+        return None
+    return hit[2]
+
+def _loads_json_bytes(raw: bytes | mmap.mmap) -> Any:
+    """Parses UTF-8 encoded JSON bytes. Errors are json.JSONDecodeError (orjson's subclasses it) or UnicodeDecodeError."""
+    if isinstance(raw, mmap.mmap): # Only produced by _read_file_bytes when orjson is available
+        try:
+            with memoryview(raw) as view: # The view must be released before the mapping can close
+                return orjson.loads(view)
+        finally:
+            raw.close()
+    if ORJSON_AVAILABLE:
+        return orjson.loads(raw)
+    return json.loads(raw.decode('utf-8'))
+
+def _parse_json_file(filename: str, filepath: str, raw: bytes | mmap.mmap, category_name: str) -> Any | None:
+    """
+    Parses one .json file's bytes as read by _read_file_bytes.
+
+    Args:
+        filename: The file's basename, used for its default 'id'.
+        filepath: The full path, used only in log messages.
+        raw: The file's raw bytes (a read-only mapping for large JSON files).
+        category_name: The category the file is being loaded into.
+
+    Returns:
+        The parsed JSON value, or None if the file was skipped.
+    """
+    try:
+        data: Any = _loads_json_bytes(raw)
+        # Ensure the loaded data has an 'id' if it's a dictionary,
+        # otherwise use filename as id. This is helpful for later processing.
+        # List roots (e.g. RaceTemplates) are kept as parsed; their items are not given ids here.
+        if isinstance(data, dict) and 'id' not in data:
+            data['id'] = os.path.splitext(filename)[0]
+        return data
+    except json.JSONDecodeError as e:
+        logging.warning("Could not parse JSON from %s: %s, skipping.", filepath, e)
+    except UnicodeDecodeError as e:
+        logging.error("Encoding error reading %s: %s, skipping.", filepath, e)
+    except Exception as e:
+        logging.error("Unexpected error while processing JSON %s: %s, skipping.", filepath, e)
+    return None
+
+def _parse_txt_file(filename: str, filepath: str, raw: bytes, category_name: str) -> dict[str, str] | None:
+    """
+    Decodes one .txt file's bytes into a RAG-ready record. Takes the same arguments as _parse_json_file.
+
+    Returns:
+        {"id": filename stem, "text_content": content, "source_category": category_name}, or None if the file was skipped.
+    """
+    try:
+        # Text mode used to translate newlines for us; keep that behaviour for TXT content.
+        content: str = raw.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+        # Store TXT content in a dictionary for consistency and RAG processing needs
+        return {
+            "id": os.path.splitext(filename)[0], # Use filename without extension as ID
+            "text_content": content,
+            "source_category": category_name # Add category for context
+        }
+    except UnicodeDecodeError as e:
+        logging.error("Encoding error reading %s: %s, skipping.", filepath, e)
+    except Exception as e:
+        logging.error("Unexpected error while processing TXT %s: %s, skipping.", filepath, e)
+    return None
+
+# File extension -> parser; anything else in a source directory is ignored. New formats only need an entry here.
+_SOURCE_FILE_PARSERS: dict[str, Callable[[str, str, Any, str], Any | None]] = {
+    ".json": _parse_json_file,
+    ".txt": _parse_txt_file,
+}
+
+def load_raw_data_from_sources(document_sources: tuple[str, ...], use_cache: bool = False) -> dict[str, list[dict[str, Any] | list[Any]]]:
     """
     Loads raw data from all specified document sources.
     Iterates through source directories, reads .json and .txt files,
     and organizes them by category (derived from directory names).
+    All sources are scanned first, then every file is read on one shared thread
+    pool so the per-file I/O latency overlaps; decoding and parsing stay on the
+    calling thread, in directory order, and start as soon as each read finishes.
 
     Args:
-        document_sources: A list of directory paths to load data from.
+        document_sources: A tuple of directory paths to load data from (config.RAG_DOCUMENT_SOURCES).
+        use_cache: If True, files whose path, modification time and size are unchanged since an
+                   earlier cached load are not read or parsed again. The cached objects are shared
+                   between calls, so only enable this for callers that treat the data as read-only.
 
     Returns:
         A dictionary where keys are category names (e.g., "NPCs", "Lore")
@@ -26,89 +164,87 @@ def load_raw_data_from_sources(document_sources: list[str]) -> dict[str, list[di
         TXT files are loaded as dictionaries: {"id": filename, "text_content": content, "source_category": category_name}
     """
     all_data: dict[str, list[dict[str, Any] | list[Any]]] = {}
+    # category -> (source_path, [(filename, filepath, stamp, parser), ...]); a later source with the same
+    # category name replaces an earlier one, exactly as resetting all_data[category_name] does.
+    pending: dict[str, tuple[str, list[tuple[str, str, tuple[str, int, int] | None, Callable]]]] = {}
     for source_path in document_sources:
         # Derive category name from the directory's basename
         # e.g., './data/NPCs' becomes 'NPCs'
         category_name = os.path.basename(source_path)
         if not category_name: # Handles cases like './data/' if it were passed
             category_name = os.path.basename(os.path.dirname(source_path))
+        # Interned so the all_data keys and every TXT record's "source_category" are the same object as
+        # the 'NPCs'/'Items'/... literals consumers look them up with (identity hits the dict fast path)
+        category_name = sys.intern(category_name)
 
         all_data[category_name] = []
+        pending.pop(category_name, None)
 
-        # Check if path exists
-        if not os.path.exists(source_path):
-            logging.warning(f"Source path does not exist: {source_path}")
-            continue
-        
-        # Check if path is a directory
-        if not os.path.isdir(source_path):
-            logging.warning(f"Source path is not a directory: {source_path}")
-            continue
-        
         try:
-            for filename in os.listdir(source_path):
-                filepath = os.path.join(source_path, filename)
-                if os.path.isdir(filepath): # Skip subdirectories
-                    continue
-                
-                # Check if file exists before attempting to open
-                if not os.path.exists(filepath):
-                    logging.warning(f"File does not exist: {filepath}")
-                    continue
-
-                if filename.endswith(".json"):
-                    try:
-                        with open(filepath, 'r', encoding='utf-8') as f:
-                            data: Any = json.load(f)
-                            # Ensure the loaded data has an 'id' if it's a dictionary,
-                            # otherwise use filename as id. This is helpful for later processing.
-                            if isinstance(data, dict) and 'id' not in data:
-                                data['id'] = os.path.splitext(filename)[0]
-                            elif isinstance(data, list): # If JSON root is a list, try to process items
-                                processed_list: list[Any] = []
-                                for item in data:
-                                    if isinstance(item, dict) and 'id' not in item:
-                                        # This might not be ideal if list items don't have natural IDs
-                                        # For now, we'll just add them as-is if they are dicts
-                                        pass
-                                    processed_list.append(item)
-                                data = processed_list # Replace data with the list of items
-                            all_data[category_name].append(data)
-                    except json.JSONDecodeError as e:
-                        logging.warning(f"Could not parse JSON from {filepath}: {e}, skipping.")
-                    except UnicodeDecodeError as e:
-                        logging.error(f"Encoding error reading {filepath}: {e}, skipping.")
-                    except PermissionError as e:
-                        logging.error(f"Permission denied reading {filepath}: {e}, skipping.")
-                    except IOError as e:
-                        logging.error(f"IO error reading {filepath}: {e}, skipping.")
-                    except Exception as e:
-                        logging.error(f"Unexpected error while processing JSON {filepath}: {e}, skipping.")
-                elif filename.endswith(".txt"):
+            # scandir itself reports missing paths and non-directories, so no separate exists/isdir stat calls;
+            # its entries carry their file type, so subdirectories are skipped without extra stat calls either
+            with os.scandir(source_path) as it:
+                entries = [(entry.name, entry.path, _file_stamp(entry) if use_cache else None,
+                            _SOURCE_FILE_PARSERS[entry.name[entry.name.rfind('.'):]]) for entry in it
+                           if entry.name[entry.name.rfind('.'):] in _SOURCE_FILE_PARSERS and entry.is_file()]
+            if entries:
+                pending[category_name] = (source_path, entries)
+        except FileNotFoundError:
+            logging.warning("Source path does not exist: %s", source_path)
+        except NotADirectoryError:
+            logging.warning("Source path is not a directory: %s", source_path)
+        except PermissionError:
+            logging.error("Permission denied accessing: %s", source_path)
+        except Exception as e:
+            logging.error("Unexpected error loading from %s: %s", source_path, e)
+
+    file_count = sum(len(entries) for _, entries in pending.values())
+    if not file_count:
+        return all_data
+
+    # One pool for every source: all reads are in flight together instead of draining per directory.
+    # Cache hits are carried through as-is and never submitted.
+    with ThreadPoolExecutor(max_workers=min(_MAX_READ_WORKERS, file_count)) as executor:
+        submitted = []
+        submit = executor.submit
+        for category_name, (source_path, entries) in pending.items():
+            reads = deque()
+            for filename, filepath, stamp, parser in entries:
+                cached = _get_cached_parse(filepath, stamp) if stamp is not None else None
+                future = submit(_read_file_bytes, filepath) if cached is None else None
+                reads.append((filename, filepath, stamp, parser, cached, future))
+            submitted.append((category_name, source_path, reads))
+
+        # Parse each file as soon as its read is done (while later reads are still running), popping it
+        # off its queue so the raw bytes held by the future are freed instead of all files being buffered at once.
+        for category_name, source_path, reads in submitted:
+            append = all_data[category_name].append # Bound once per category rather than looked up per file
+            try:
+                while reads:
+                    filename, filepath, stamp, parser, cached, future = reads.popleft()
+                    if cached is not None:
+                        append(cached)
+                        continue
                     try:
-                        with open(filepath, 'r', encoding='utf-8') as f:
-                            content: str = f.read()
-                            # Store TXT content in a dictionary for consistency and RAG processing needs
-                            txt_data: dict[str, str] = {
-                                "id": os.path.splitext(filename)[0], # Use filename without extension as ID
-                                "text_content": content,
-                                "source_category": category_name # Add category for context
-                            }
-                            all_data[category_name].append(txt_data)
-                    except UnicodeDecodeError as e:
-                        logging.error(f"Encoding error reading {filepath}: {e}, skipping.")
+                        raw = future.result()
                     except PermissionError as e:
-                        logging.error(f"Permission denied reading {filepath}: {e}, skipping.")
+                        logging.error("Permission denied reading %s: %s, skipping.", filepath, e)
+                        continue
                     except IOError as e:
-                        logging.error(f"IO error reading {filepath}: {e}, skipping.")
-                    except Exception as e:
-                        logging.error(f"Unexpected error while processing TXT {filepath}: {e}, skipping.")
-        except PermissionError:
-            logging.error(f"Permission denied accessing: {source_path}")
-        except Exception as e:
-            logging.error(f"Unexpected error loading from {source_path}: {e}")
+                        logging.error("IO error reading %s: %s, skipping.", filepath, e)
+                        continue
+                    data = parser(filename, filepath, raw, category_name)
+                    if data is not None:
+                        append(data)
+                        if stamp is not None:
+                            _PARSE_CACHE[filepath] = (stamp[0], stamp[1], data)
+            except Exception as e:
+                logging.error("Unexpected error loading from %s: %s", source_path, e)
     return all_data
 
+_NPC_REQUIRED_KEYS = ('id', 'name', 'max_hp', 'combat_stats', 'base_damage_dice')
+_get_npc_required_fields = operator.itemgetter(*_NPC_REQUIRED_KEYS)
+
 def create_npc_from_data(npc_data: dict[str, Any]) -> dict[str, Any] | None:
     """
     Creates an NPC instance from a dictionary of NPC data.
@@ -129,44 +265,46 @@ def create_npc_from_data(npc_data: dict[str, Any]) -> dict[str, Any] | None:
         if not isinstance(npc_data, dict):
             raise TypeError(f"Expected dict, got {type(npc_data).__name__}")
         
-        required_keys = ['id', 'name', 'max_hp', 'combat_stats', 'base_damage_dice']
-        for key in required_keys:
-            if key not in npc_data:
-                raise KeyError(f"Missing essential key '{key}'")
+        try:
+            # One C-level call fetches every required field; it raises on the first missing one, in _NPC_REQUIRED_KEYS order
+            npc_id, name, max_hp, combat_stats, base_damage_dice = _get_npc_required_fields(npc_data)
+        except KeyError as e:
+            raise KeyError(f"Missing essential key '{e.args[0]}'") from None
 
         # Validate data types for critical fields
-        if not isinstance(npc_data['max_hp'], (int, float)):
-            raise TypeError(f"max_hp must be numeric, got {type(npc_data['max_hp']).__name__}")
+        if not isinstance(max_hp, (int, float)):
+            raise TypeError(f"max_hp must be numeric, got {type(max_hp).__name__}")
         
-        if not isinstance(npc_data['combat_stats'], dict):
-            raise TypeError(f"combat_stats must be dict, got {type(npc_data['combat_stats']).__name__}")
+        if not isinstance(combat_stats, dict):
+            raise TypeError(f"combat_stats must be dict, got {type(combat_stats).__name__}")
         
-        if not isinstance(npc_data['base_damage_dice'], str):
-            raise TypeError(f"base_damage_dice must be string, got {type(npc_data['base_damage_dice']).__name__}")
+        if not isinstance(base_damage_dice, str):
+            raise TypeError(f"base_damage_dice must be string, got {type(base_damage_dice).__name__}")
 
         # Prepare a dictionary for NPC instantiation, including optional fields
+        get = npc_data.get
         processed_data: dict[str, Any] = {
-            'id': npc_data['id'],
-            'name': npc_data['name'],
-            'max_hp': npc_data['max_hp'],
-            'combat_stats': npc_data['combat_stats'],
-            'base_damage_dice': npc_data['base_damage_dice'],
-            'dialogue_responses': npc_data.get("dialogue_responses"),
-            'active_time_periods': npc_data.get("active_time_periods"),
-            'is_currently_active': npc_data.get("is_currently_active", True) # Default to True
+            'id': npc_id,
+            'name': name,
+            'max_hp': max_hp,
+            'combat_stats': combat_stats,
+            'base_damage_dice': base_damage_dice,
+            'dialogue_responses': get("dialogue_responses"),
+            'active_time_periods': get("active_time_periods"),
+            'is_currently_active': get("is_currently_active", True) # Default to True
         }
         return processed_data
     except KeyError as e:
         npc_name = str(npc_data.get('name', npc_data.get('id', 'Unknown NPC'))) if isinstance(npc_data, dict) else 'Unknown NPC'
-        logging.warning(f"Missing essential data for NPC '{npc_name}'. Details: {e}. Skipping NPC data processing.")
+        logging.warning("Missing essential data for NPC '%s'. Details: %s. Skipping NPC data processing.", npc_name, e)
         return None
     except TypeError as e:
         npc_name_type = str(npc_data.get('name', npc_data.get('id', 'Unknown NPC'))) if isinstance(npc_data, dict) else 'Unknown NPC'
-        logging.error(f"Type validation error for NPC '{npc_name_type}': {e}. Skipping.")
+        logging.error("Type validation error for NPC '%s': %s. Skipping.", npc_name_type, e)
         return None
     except Exception as e:
         npc_name_exc = str(npc_data.get('name', npc_data.get('id', 'Unknown NPC'))) if isinstance(npc_data, dict) else 'Unknown NPC'
-        logging.error(f"Error processing NPC data for '{npc_name_exc}': {e}. Skipping.")
+        logging.error("Error processing NPC data for '%s': %s. Skipping.", npc_name_exc, e)
         return None
 
 # Old load_game_data and load_npcs_from_directory are now removed.
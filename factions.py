@@ -1,6 +1,8 @@
 from typing import Optional, Dict, List
 
 class Faction:
+    __slots__ = ('id', 'name', 'description', 'goals', 'relationships', 'members')
+
     def __init__(self,
                  id: str,
                  name: str,
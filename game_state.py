@@ -1,6 +1,9 @@
-from utils import roll_dice, SKILL_ABILITY_MAP, PROFICIENCY_BONUS
+from utils import roll_dice, parse_dice, get_dice_pool, SKILL_ABILITY_MAP, PROFICIENCY_BONUS
 import random # random is still used by other parts of game_state.py like status effect application
 import logging # For logging warnings
+import functools
+from collections import Counter
+from types import MappingProxyType
 from magic import SPELLBOOK, Spell # Import necessary spellcasting components
 from gemini_dm import notify_dm # Import for DM notifications
 from quests import ALL_QUESTS # Import for accessing quest details
@@ -13,6 +16,24 @@ import json # For main block example printing
 from data_loader import load_raw_data_from_sources, create_npc_from_data
 from config import RAG_DOCUMENT_SOURCES
 
+_roll_d20 = get_dice_pool(20).next # Single d20s (skill checks, initiative) skip roll_dice's call and validation
+
+@functools.lru_cache(maxsize=128)
+def _resolve_skill(skill_name:str)->tuple[str,str|None,str]:
+    """Returns (normalized skill, ability name or None, breakdown label) for a skill name; cached per spelling."""
+    norm=skill_name.lower(); ability=SKILL_ABILITY_MAP.get(norm)
+    return norm, ability, (ability.upper() if ability else "N/A")
+
+class _LazyBreakdown:
+    """Skill-check breakdown; the text is only formatted when str() is called (e.g. when shown or logged)."""
+    __slots__ = ('roll','abil_label','abil_mod','prof_b','total','dc')
+    def __init__(self, roll:int, abil_label:str, abil_mod:int|None, prof_b:int, total:int, dc:int):
+        self.roll=roll; self.abil_label=abil_label; self.abil_mod=abil_mod; self.prof_b=prof_b; self.total=total; self.dc=dc
+    def __str__(self):
+        abil_mod_s = "N/A" if self.abil_mod is None else self.abil_mod
+        return f"d20({self.roll})+{self.abil_label}_MOD({abil_mod_s})+PROF({self.prof_b})={self.total} vs DC({self.dc})"
+    __repr__ = __str__
+
 
 # --- CLASS DEFINITIONS (Location, Item, Weapon, Armor, Consumable, KeyItem, Character, Player, NPC) ---
 # These class definitions are assumed to be the same as provided in the previous successful step.
@@ -68,8 +89,12 @@ class Location:
         self.is_currently_open = is_currently_open
     def __repr__(self): return f"<Location(id='{self.id}', name='{self.name}')>"
 
+# Integer item kinds, set as a class attribute on each Item subclass for cheap dispatch
+ITEM_KIND_GENERIC, ITEM_KIND_WEAPON, ITEM_KIND_ARMOR, ITEM_KIND_CONSUMABLE, ITEM_KIND_KEY = 0, 1, 2, 3, 4
+
 class Item:
     """ Base class for all items. JSON structure: (as previously defined) """
+    _kind = ITEM_KIND_GENERIC
     def __init__(self, id: str, name: str, description: str, item_type: str,
                  weight: float = 0.0, value: dict = None, lore_keywords: list[str] = None):
         if not id or not isinstance(id, str): raise ValueError("Item ID must be a non-empty string.")
@@ -85,6 +110,7 @@ class Item:
 
 class Weapon(Item):
     """ Weapon item. JSON structure: (as previously defined) """
+    _kind = ITEM_KIND_WEAPON
     def __init__(self, id: str, name: str, description: str,
                  damage_dice: str, attack_bonus: int = 0, damage_bonus: int = 0,
                  weapon_type: str = "sword", weight: float = 0.0, value: dict = None,
@@ -99,6 +125,7 @@ class Weapon(Item):
 
 class Armor(Item):
     """ Armor item. JSON structure: (as previously defined) """
+    _kind = ITEM_KIND_ARMOR
     def __init__(self, id: str, name: str, description: str,
                  ac_bonus: int, armor_type: str = "medium",
                  weight: float = 0.0, value: dict = None,
@@ -107,10 +134,12 @@ class Armor(Item):
         if not isinstance(ac_bonus, int): raise ValueError("Armor ac_bonus must be an integer.")
         self.ac_bonus = ac_bonus
         self.armor_type = armor_type
+        self._is_shield = armor_type=="shield"
     def __repr__(self): return f"<Armor(id='{self.id}', name='{self.name}', ac_bonus='{self.ac_bonus}')>"
 
 class Consumable(Item):
     """ Consumable item. JSON structure: (as previously defined) """
+    _kind = ITEM_KIND_CONSUMABLE
     def __init__(self, id: str, name: str, description: str,
                  effects: list[dict], weight: float = 0.0, value: dict = None,
                  lore_keywords: list[str] = None):
@@ -121,6 +150,7 @@ class Consumable(Item):
 
 class KeyItem(Item):
     """ Key item. JSON structure: (as previously defined) """
+    _kind = ITEM_KIND_KEY
     def __init__(self, id: str, name: str, description: str,
                  unlocks: list[str] = None, weight: float = 0.0, value: dict = None,
                  lore_keywords: list[str] = None):
@@ -130,7 +160,26 @@ class KeyItem(Item):
 
 from character import Character
 
+CURRENCY_TYPES = ("gold","silver","copper") # Index order of Player.currency
+GOLD, SILVER, COPPER = 0, 1, 2
+EQUIPMENT_SLOT_ATTRS = {"weapon":"weapon_id","armor":"armor_id","shield":"shield_id"} # Equippable slot -> Player attribute
+MAX_SPELL_LEVEL = 9 # Player.spell_slot_current/spell_slot_max are indexed by spell level 0..MAX_SPELL_LEVEL
+
+class _ActiveQuestState:
+    """Progress of one active quest (Player.active_quests values)."""
+    __slots__ = ('current_stage_id','completed_optional_objectives')
+    def __init__(self, stage_id:str, completed_optional_objectives=()):
+        self.current_stage_id = stage_id
+        self.completed_optional_objectives: set[str] = set(completed_optional_objectives)
+    @classmethod
+    def from_dict(cls, data:dict)->'_ActiveQuestState': return cls(data.get("current_stage_id"), data.get("completed_optional_objectives",()))
+    def __repr__(self): return f"<ActiveQuest(stage='{self.current_stage_id}', optional_done={sorted(self.completed_optional_objectives)})>"
+
 class Player(Character):
+    __slots__ = ('ability_scores', 'skills_list', 'proficiencies_map',
+                 'spell_slot_current', 'spell_slot_max', 'discovered_clues', 'experience_points', 'inventory', 'weapon_id', 'armor_id', 'shield_id', '_other_equipment', 'currency',
+                 'base_armor_class', '_equip_version', '_ac_cache', '_weapon_cache',
+                 'active_quests', 'completed_quests', '_completed_quests_set', 'visited_locations', 'faction_reputations')
     def __init__(self, player_data: dict, equipment_data: dict = None): # equipment_data is legacy, not actively used for init
         super().__init__(player_data.get("id","player"), player_data.get("name","Player"), player_data.get("max_hp",10),
                          player_data.get("combat_stats",{}), player_data.get("base_damage_dice","1d4"))
@@ -138,17 +187,26 @@ class Player(Character):
         self.skills_list = player_data.get("skills",[])
         self.proficiencies_map = player_data.get("proficiencies",{"skills":[]})
         if "skills" not in self.proficiencies_map: self.proficiencies_map["skills"]=[]
-        self.spell_slots = player_data.get("spell_slots",{})
+        self.spell_slots = player_data.get("spell_slots",{}) # Parsed into spell_slot_current/spell_slot_max by the setter
         self.discovered_clues: list[str] = player_data.get("discovered_clues",[])
         self.experience_points = player_data.get("experience_points",0)
-        self.inventory: list[str] = player_data.get("inventory",[])
-        self.equipment: dict[str, str|None|dict] = player_data.get("equipment",{})
-        if "currency" not in self.equipment: self.equipment["currency"]={}
-        for slot in ["weapon","armor","shield"]:
-            if slot not in self.equipment: self.equipment[slot]=None
+        self.inventory: Counter[str] = Counter(player_data.get("inventory",[])) # item_id -> count
+        equipment = dict(player_data.get("equipment",{}))
+        legacy_currency = equipment.pop("currency",None) # Saves/templates keep currency inside equipment
+        if not isinstance(legacy_currency,(dict,MappingProxyType)): legacy_currency={} # MappingProxyType: a reloaded Player.equipment view
+        self.currency: list[int] = [legacy_currency.get(c_type,0) for c_type in CURRENCY_TYPES] # [gold, silver, copper]
+        for slot,attr in EQUIPMENT_SLOT_ATTRS.items():
+            item_id = equipment.pop(slot,None)
+            setattr(self,attr,item_id if isinstance(item_id,str) and item_id else None)
+        self._other_equipment: dict = equipment # Non-equippable slots (helmet, rings, ...), kept as-is for saving
         self.base_armor_class = self.combat_stats.get('armor_class',10)
-        self.active_quests = player_data.get("active_quests",{})
+        # Equipment-derived caches are stored as (value, version) and invalidated by bumping _equip_version
+        self._equip_version = 0
+        self._ac_cache: tuple[int|None,int] = (None,-1)
+        self._weapon_cache: tuple[tuple[str,int,int]|None,int] = (None,-1)
+        self.active_quests: dict[str,_ActiveQuestState] = {q_id:_ActiveQuestState.from_dict(q_data) for q_id,q_data in player_data.get("active_quests",{}).items()}
         self.completed_quests = player_data.get("completed_quests",[])
+        self._completed_quests_set: set[str] = set(self.completed_quests) # Membership index; keep in sync with completed_quests
         self.visited_locations: set[str] = set(player_data.get("visited_locations", []))
         self.faction_reputations: dict[str, int] = player_data.get("faction_reputations", {})
     def _get_item_from_game_state(self, item_id:str, game_state:'GameState')->Item|None:
@@ -156,52 +214,71 @@ class Player(Character):
         item = game_state.items.get(item_id)
         if not item: logging.warning(f"Player {self.name}: Item ID '{item_id}' not found in GameState.items.")
         return item
+    @property
+    def equipment(self)->MappingProxyType:
+        """Read-only save view of the equipment slots: {"weapon":..., "armor":..., "shield":..., <other slots>, "currency":{...}}.
+        Built fresh on each access, so it cannot be edited in place (that raises TypeError); use equip_item/unequip_item/change_currency."""
+        return MappingProxyType({"weapon":self.weapon_id,"armor":self.armor_id,"shield":self.shield_id,**self._other_equipment,
+                                 "currency":MappingProxyType(self.currency_dict)})
     def equip_item(self, item_id:str, slot:str, game_state:'GameState')->bool:
         item = self._get_item_from_game_state(item_id, game_state)
         if not item: return False
-        if slot not in self.equipment: logging.warning(f"Player {self.name}: Slot '{slot}' nonexistent."); return False
-        valid = (slot=="weapon" and isinstance(item,Weapon)) or \
-                (slot=="armor" and isinstance(item,Armor) and item.armor_type!="shield") or \
-                (slot=="shield" and isinstance(item,Armor) and item.armor_type=="shield")
+        attr = EQUIPMENT_SLOT_ATTRS.get(slot)
+        if attr is None: logging.warning(f"Player {self.name}: Slot '{slot}' nonexistent."); return False
+        kind = item._kind
+        valid = (slot=="weapon" and kind==ITEM_KIND_WEAPON) or \
+                (slot=="armor" and kind==ITEM_KIND_ARMOR and not item._is_shield) or \
+                (slot=="shield" and kind==ITEM_KIND_ARMOR and item._is_shield)
         if not valid: logging.warning(f"Player {self.name}: Cannot equip {item.name}({item.item_type}) in {slot}."); return False
-        curr_item_id = self.equipment.get(slot)
-        if isinstance(curr_item_id,str) and curr_item_id!=item_id: self.add_to_inventory(curr_item_id)
-        self.equipment[slot]=item_id
+        curr_item_id = getattr(self,attr)
+        if curr_item_id and curr_item_id!=item_id: self.add_to_inventory(curr_item_id)
+        setattr(self,attr,item_id); self._equip_version+=1
         if item_id in self.inventory: self.remove_from_inventory(item_id)
-        notify_dm(f"{self.name} equipped {item.name} in {slot}.")
+        if notify_dm.enabled: notify_dm(f"{self.name} equipped {item.name} in {slot}.")
         return True
     def unequip_item(self, slot:str, game_state:'GameState')->str|None:
-        if slot not in self.equipment: logging.warning(f"Player {self.name}: Slot '{slot}' nonexistent."); return None
-        item_id = self.equipment.get(slot)
-        if isinstance(item_id,str):
-            item_obj = self._get_item_from_game_state(item_id,game_state)
-            name = item_obj.name if item_obj else item_id
-            self.equipment[slot]=None
+        attr = EQUIPMENT_SLOT_ATTRS.get(slot)
+        if attr is None: logging.warning(f"Player {self.name}: Slot '{slot}' nonexistent."); return None
+        item_id = getattr(self,attr)
+        if item_id:
+            setattr(self,attr,None); self._equip_version+=1
             self.add_to_inventory(item_id)
-            notify_dm(f"{self.name} unequipped {name} from {slot}. Added to inventory.")
+            if notify_dm.enabled:
+                item_obj = self._get_item_from_game_state(item_id,game_state)
+                name = item_obj.name if item_obj else item_id
+                notify_dm(f"{self.name} unequipped {name} from {slot}. Added to inventory.")
             return item_id
         return None
-    def get_equipped_weapon_stats(self, game_state:'GameState')->dict:
-        wp_id = self.equipment.get("weapon")
-        if isinstance(wp_id,str):
+    def get_equipped_weapon_stats(self, game_state:'GameState')->tuple[str,int,int]:
+        """Returns (damage_dice, attack_bonus, damage_bonus) of the equipped weapon, or the unarmed base values."""
+        cached,version = self._weapon_cache
+        if version==self._equip_version: return cached
+        stats = (self.base_damage_dice,0,0); cacheable=True
+        wp_id = self.weapon_id
+        if wp_id:
             item = self._get_item_from_game_state(wp_id,game_state)
-            if isinstance(item,Weapon): return {"damage_dice":item.damage_dice,"attack_bonus":item.attack_bonus,"damage_bonus":item.damage_bonus}
-        return {"damage_dice":self.base_damage_dice,"attack_bonus":0,"damage_bonus":0}
+            if item is not None and item._kind==ITEM_KIND_WEAPON: stats = (item.damage_dice,item.attack_bonus,item.damage_bonus)
+            elif item is None: cacheable=False # Items may not be loaded yet; retry next time
+        if cacheable: self._weapon_cache=(stats,self._equip_version)
+        return stats
     def get_equipped_armor_ac_bonus(self, game_state:'GameState')->int:
-        ac_bonus=0
-        for slot_type in ["armor","shield"]:
-            item_id = self.equipment.get(slot_type)
-            if isinstance(item_id,str):
+        cached,version = self._ac_cache
+        if version==self._equip_version: return cached
+        ac_bonus=0; cacheable=True
+        for item_id,is_shield_slot in ((self.armor_id,False),(self.shield_id,True)):
+            if item_id:
                 item = self._get_item_from_game_state(item_id,game_state)
-                if isinstance(item,Armor) and ((slot_type=="armor" and item.armor_type!="shield") or (slot_type=="shield" and item.armor_type=="shield")):
+                if item is None: cacheable=False
+                elif item._kind==ITEM_KIND_ARMOR and item._is_shield==is_shield_slot:
                     ac_bonus+=item.ac_bonus
+        if cacheable: self._ac_cache=(ac_bonus,self._equip_version)
         return ac_bonus
     def get_effective_armor_class(self,game_state:'GameState')->int: return self.base_armor_class + self.get_equipped_armor_ac_bonus(game_state)
     def use_item(self,item_id:str,game_state:'GameState',target:'Character'=None)->tuple[bool,str]:
         if item_id not in self.inventory: return False, f"Item '{item_id}' not in inventory."
         item = self._get_item_from_game_state(item_id,game_state)
         if not item: return False, f"Item data for '{item_id}' not retrieved."
-        if not isinstance(item,Consumable): return False, f"'{item.name}' is not consumable."
+        if item._kind!=ITEM_KIND_CONSUMABLE: return False, f"'{item.name}' is not consumable."
         tgt = target if target else self
         msgs = [f"{self.name} uses {item.name}."]
         for eff in item.effects:
@@ -209,12 +286,8 @@ class Player(Character):
             if eff_type=="heal":
                 amt_str = eff.get("amount","0"); roll_amt=0
                 try:
-                    if 'd' in amt_str:
-                        parts=amt_str.split('d'); num_d=int(parts[0]); dice_p=parts[1]; bonus=0
-                        if '+' in dice_p: d_sides_str,b_str = dice_p.split('+'); bonus=int(b_str)
-                        else: d_sides_str=dice_p
-                        roll_amt=roll_dice(int(d_sides_str),num_d)+bonus
-                    else: roll_amt=int(amt_str)
+                    num_d,d_sides,bonus=parse_dice(str(amt_str))
+                    roll_amt=(roll_dice(d_sides,num_d) if num_d else 0)+bonus
                     roll_amt=max(0,roll_amt); tgt.heal(roll_amt)
                     msgs.append(f"{tgt.name} healed for {roll_amt} HP. HP: {tgt.current_hp}/{tgt.max_hp}")
                 except ValueError: msgs.append(f"Invalid amount format: {amt_str}"); logging.error(f"Invalid heal amount {item_id}: {amt_str}")
@@ -223,41 +296,39 @@ class Player(Character):
                 msgs.append(f"{tgt.name} buff to {stat} by {mod} for {dur} (Buffs not fully implemented).")
                 logging.info(f"Buff from {item_id} to {tgt.name}: stat {stat}, mod {mod}, dur {dur}")
             else: msgs.append(f"Unknown effect '{eff_type}' for '{item.name}'.")
-        self.remove_from_inventory(item_id); notify_dm(". ".join(msgs))
-        return True, ". ".join(msgs)
+        self.remove_from_inventory(item_id); result_msg = ". ".join(msgs)
+        if notify_dm.enabled: notify_dm(result_msg)
+        return True, result_msg
     def add_to_inventory(self,item_id:str):
         if not isinstance(item_id,str): raise TypeError("Item ID string.");
         if not item_id.strip(): raise ValueError("Item ID non-empty.")
-        self.inventory.append(item_id)
+        self.inventory[item_id]+=1
     def remove_from_inventory(self,item_id:str)->bool:
         if not isinstance(item_id,str): raise TypeError("Item ID string.")
-        try: self.inventory.remove(item_id); return True
-        except ValueError: return False
+        count=self.inventory.get(item_id,0)
+        if count<=0: return False
+        if count==1: del self.inventory[item_id]
+        else: self.inventory[item_id]=count-1
+        return True
+    @property
+    def currency_dict(self)->dict[str,int]: return dict(zip(CURRENCY_TYPES,self.currency))
     def change_currency(self,gold_d=0,silver_d=0,copper_d=0)->bool:
-        if "currency" not in self.equipment or not isinstance(self.equipment["currency"],dict): self.equipment["currency"]={}
-        for c_type in ["gold","silver","copper"]:
-            if c_type not in self.equipment["currency"]: self.equipment["currency"][c_type]=0
-        if gold_d<0 and self.equipment["currency"].get("gold",0)<abs(gold_d): return False
-        self.equipment["currency"]["gold"] = self.equipment["currency"].get("gold",0)+gold_d
-        self.equipment["currency"]["silver"] = self.equipment["currency"].get("silver",0)+silver_d
-        self.equipment["currency"]["copper"] = self.equipment["currency"].get("copper",0)+copper_d
+        currency=self.currency
+        if gold_d<0 and currency[GOLD]< -gold_d: return False
+        currency[GOLD]+=gold_d; currency[SILVER]+=silver_d; currency[COPPER]+=copper_d
         return True
     def get_ability_modifier(self,ability_name:str)->int:
-        score=self.ability_scores.get(ability_name.lower())
+        score=self.ability_scores.get(ability_name.lower()) # Read live: ability_scores is public and edited in place
         if score is None or not isinstance(score,int): logging.warning(f"Ability '{ability_name.lower()}' invalid for {self.name}. Mod 0."); return 0
         return(score-10)//2
-    def perform_skill_check(self,skill_name:str,dc:int)->tuple[bool,int,int,str]:
-        skill_norm=skill_name.lower(); roll=roll_dice(20)
-        abil_name=SKILL_ABILITY_MAP.get(skill_norm); abil_mod=0; abil_mod_s="N/A"
-        if abil_name: abil_mod=self.get_ability_modifier(abil_name); abil_mod_s=str(abil_mod)
-        else: logging.warning(f"Skill '{skill_norm}' not in SKILL_ABILITY_MAP for {self.name}.")
-        prof_b=0; prof_b_s="0"
+    def perform_skill_check(self,skill_name:str,dc:int)->tuple[bool,int,int,_LazyBreakdown]:
+        skill_norm,abil_name,abil_label=_resolve_skill(skill_name); roll=_roll_d20()
+        if abil_name: abil_mod=self.get_ability_modifier(abil_name)
+        else: abil_mod=None; logging.warning(f"Skill '{skill_norm}' not in SKILL_ABILITY_MAP for {self.name}.")
         prof_s=self.proficiencies_map.get('skills',[])
-        if not isinstance(prof_s,list): prof_s=[]
-        if skill_norm in prof_s: prof_b=PROFICIENCY_BONUS; prof_b_s=str(prof_b)
-        total=roll+abil_mod+prof_b; success=total>=dc
-        breakdown=f"d20({roll})+{abil_name.upper() if abil_name else 'N/A'}_MOD({abil_mod_s})+PROF({prof_b_s})={total} vs DC({dc})"
-        return success,roll,total,breakdown
+        prof_b=PROFICIENCY_BONUS if isinstance(prof_s,list) and skill_norm in prof_s else 0
+        total=roll+(abil_mod or 0)+prof_b; success=total>=dc
+        return success,roll,total,_LazyBreakdown(roll,abil_label,abil_mod,prof_b,total,dc)
     def cast_spell(self,spell_name:str,game_state:'GameState',target:'Character'=None)->tuple[bool,str]:
         spell=SPELLBOOK.get(spell_name)
         if not spell: return False, f"Spell '{spell_name}' not found."
@@ -266,18 +337,14 @@ class Player(Character):
         if not isinstance(actual_t,Character): return False, "Invalid target type."
         slot_msg_part=""
         if spell.level>0:
-            if not self.has_spell_slot(spell.level): return False, f"No L{spell.level} slots for '{spell_name}'."
-            if not self.consume_spell_slot(spell.level): logging.error(f"Fail consume slot for '{spell_name}' for {self.name}."); return False, f"Error consume slot for '{spell_name}'."
+            if not self.try_consume_spell_slot(spell.level): logging.info(f"{self.name} has no L{spell.level} slots left for '{spell_name}'."); return False, f"No L{spell.level} slots for '{spell_name}'."
             slot_msg_part=f", consuming L{spell.level} slot"
         base_val=0; dice_s=""
         if spell.dice_expression:
             try:
-                parts=spell.dice_expression.lower().split('d'); num_d,d_sides=1,0
-                if len(parts)==2: num_d_s,d_sides_s=parts; d_sides=int(d_sides_s); num_d=int(num_d_s) if num_d_s else 1
-                elif len(parts)==1 and parts[0].isdigit(): d_sides=int(parts[0]); num_d=1
-                else: raise ValueError("Invalid format.")
-                if num_d<=0 or d_sides<=0: raise ValueError("Dice/sides positive.")
-                roll_res=roll_dice(d_sides,num_d); base_val+=roll_res; dice_s=f"{spell.dice_expression}({roll_res})"
+                num_d,d_sides,d_mod=parse_dice(spell.dice_expression)
+                if not num_d: num_d,d_sides,d_mod=1,d_mod,0 # A bare number in a spell means a single die with that many sides
+                roll_res=roll_dice(d_sides,num_d)+d_mod; base_val+=roll_res; dice_s=f"{spell.dice_expression}({roll_res})"
             except ValueError as e: logging.error(f"Error parse dice spell '{spell_name}': {e}"); return False, f"Error spell '{spell_name}': Invalid dice."
         abil_mod_val=0; mod_s=""
         if spell.stat_modifier_ability: abil_mod_val=self.get_ability_modifier(spell.stat_modifier_ability); mod_s=f" + {spell.stat_modifier_ability[:3].upper()}({abil_mod_val})"
@@ -291,10 +358,30 @@ class Player(Character):
         else: calc_f=str(total_val)
         msg=f"{self.name} casts '{spell_name}' on {target_n}{slot_msg_part}. {eff_desc} ({calc_f})"
         return True,msg
-    def has_spell_slot(self,spell_level:int)->bool: return self.spell_slots.get(f"level_{spell_level}",{}).get("current",0)>0
-    def consume_spell_slot(self,spell_level:int)->bool:
-        if self.has_spell_slot(spell_level): self.spell_slots[f"level_{spell_level}"]["current"]-=1; return True
-        return False
+    @property
+    def spell_slots(self)->MappingProxyType:
+        """Read-only save/load view in the player_template.json format: {"level_N": {"current": c, "maximum": m}} for every level with slots.
+        Built fresh on each access, so editing it raises TypeError; spend slots with try_consume_spell_slot()."""
+        cur,mx = self.spell_slot_current,self.spell_slot_max
+        return MappingProxyType({f"level_{lvl}":MappingProxyType({"current":cur[lvl],"maximum":mx[lvl]})
+                                 for lvl in range(1,MAX_SPELL_LEVEL+1) if cur[lvl] or mx[lvl]})
+    @spell_slots.setter
+    def spell_slots(self,slots:dict):
+        cur=[0]*(MAX_SPELL_LEVEL+1); mx=[0]*(MAX_SPELL_LEVEL+1)
+        for key,val in (slots or {}).items():
+            try: lvl=int(key[6:]) if isinstance(key,str) and key.startswith("level_") else -1
+            except ValueError: lvl=-1
+            if not 0<=lvl<=MAX_SPELL_LEVEL or not isinstance(val,(dict,MappingProxyType)): logging.warning(f"Player {self.name}: Ignoring invalid spell slot entry {key}: {val}"); continue
+            cur[lvl]=val.get("current",0); mx[lvl]=val.get("maximum",cur[lvl])
+        self.spell_slot_current: list[int] = cur; self.spell_slot_max: list[int] = mx
+    def has_spell_slot(self,spell_level:int)->bool: return 0<=spell_level<=MAX_SPELL_LEVEL and self.spell_slot_current[spell_level]>0
+    def try_consume_spell_slot(self,spell_level:int)->bool:
+        """Spends one slot of spell_level if available; returns False (and changes nothing) otherwise."""
+        if not 0<=spell_level<=MAX_SPELL_LEVEL: return False
+        cur=self.spell_slot_current; left=cur[spell_level]
+        if left<=0: return False
+        cur[spell_level]=left-1; return True
+    consume_spell_slot = try_consume_spell_slot
     def apply_rewards(self,rewards:dict, game_state: 'GameState')->list[str]:
         msgs=[]
         if "xp" in rewards and isinstance(rewards["xp"],int) and rewards["xp"]>0: self.experience_points+=rewards["xp"]; msgs.append(f"Gained {rewards['xp']} XP.")
@@ -304,70 +391,73 @@ class Player(Character):
                 else: logging.warning(f"Invalid item_id in rewards: {item_id}")
         if "currency" in rewards and isinstance(rewards["currency"],dict):
             for c_type,amt in rewards["currency"].items():
-                if isinstance(c_type,str) and isinstance(amt,int) and amt>0:
-                    if "currency" not in self.equipment: self.equipment["currency"]={}
-                    self.equipment["currency"][c_type]=self.equipment.get("currency",{}).get(c_type,0)+amt
+                if c_type in CURRENCY_TYPES and isinstance(amt,int) and amt>0:
+                    self.currency[CURRENCY_TYPES.index(c_type)]+=amt
                     msgs.append(f"Received {amt} {c_type}.")
                 else: logging.warning(f"Invalid currency rewards: {c_type},{amt}")
 
         if "faction_rep_changes" in rewards and isinstance(rewards["faction_rep_changes"], list):
+            change_rep = self.change_faction_reputation; rep_msgs = []
             for rep_change in rewards["faction_rep_changes"]:
                 if isinstance(rep_change, dict):
                     faction_id = rep_change.get("faction_id")
                     amount = rep_change.get("amount")
                     if faction_id and isinstance(amount, int):
-                        self.change_faction_reputation(faction_id, amount, game_state)
-                        # The change_faction_reputation method already logs and notifies DM
+                        rep_msg = change_rep(faction_id, amount, game_state, notify=False)
+                        if rep_msg: rep_msgs.append(rep_msg)
                     else:
                         logging.warning(f"Player {self.name}: Invalid faction reputation change data in rewards: {rep_change}")
                 else:
                     logging.warning(f"Player {self.name}: Invalid entry in faction_rep_changes list: {rep_change}")
+            if rep_msgs: notify_dm("\n".join(rep_msgs)) # One notification for the whole payload
 
-        if msgs: notify_dm(f"Rewards for {self.name}: {'. '.join(msgs)}.")
+        if msgs and notify_dm.enabled: notify_dm(f"Rewards for {self.name}: {'. '.join(msgs)}.")
         return msgs
     def accept_quest(self, q_id:str, stage_id:str)->tuple[bool,str]:
         if q_id in self.active_quests: return False, f"Quest '{q_id}' active."
-        if q_id in self.completed_quests: return False, f"Quest '{q_id}' completed."
-        self.active_quests[q_id]={"current_stage_id":stage_id,"completed_optional_objectives":[]}
+        if q_id in self._completed_quests_set: return False, f"Quest '{q_id}' completed."
+        self.active_quests[q_id]=_ActiveQuestState(stage_id)
         q_obj=ALL_QUESTS.get(q_id); desc="Adventure begins!"
         if q_obj:
-            stage=next((s for s in q_obj.stages if s["stage_id"]==stage_id),None)
+            stage=q_obj.stages_by_id.get(stage_id)
             if stage and stage.get("status_description"): desc=stage["status_description"]
         notify_dm(f"Quest '{q_id}' ({q_obj.title if q_obj else ''}) accepted by {self.name}. Stage: {stage_id}. {desc}")
         return True, f"Quest '{q_id}' accepted."
     def advance_quest_stage(self,q_id:str,new_stage_id:str)->tuple[bool,str]:
         if q_id in self.active_quests:
-            self.active_quests[q_id]["current_stage_id"]=new_stage_id
+            self.active_quests[q_id].current_stage_id=new_stage_id
             q_obj=ALL_QUESTS.get(q_id); desc=f"Player {self.name} advanced to stage '{new_stage_id}'."
             if q_obj:
-                stage=next((s for s in q_obj.stages if s["stage_id"]==new_stage_id),None)
+                stage=q_obj.stages_by_id.get(new_stage_id)
                 if stage and stage.get("status_description"): desc=stage["status_description"]
             notify_dm(f"Quest '{q_id}' ({q_obj.title if q_obj else ''}) for {self.name} advanced. Stage: {new_stage_id}. {desc}")
             return True, f"Quest '{q_id}' advanced to {new_stage_id}."
         return False, f"Quest '{q_id}' not active."
     def complete_optional_objective(self,q_id:str,opt_id:str)->tuple[bool,str]:
         if q_id in self.active_quests:
-            if opt_id not in self.active_quests[q_id]["completed_optional_objectives"]:
-                self.active_quests[q_id]["completed_optional_objectives"].append(opt_id)
+            done_opts=self.active_quests[q_id].completed_optional_objectives
+            if opt_id not in done_opts:
+                done_opts.add(opt_id)
                 q_obj=ALL_QUESTS.get(q_id); desc=f"Player {self.name} completed opt obj '{opt_id}'."
                 if q_obj:
-                    opt_o=next((o for o in q_obj.optional_objectives if o["objective_id"]==opt_id),None)
+                    opt_o=q_obj.optional_objectives_by_id.get(opt_id)
                     if opt_o and opt_o.get("status_description"): desc=opt_o["status_description"]
                 notify_dm(f"Opt obj '{opt_id}' for quest '{q_id}' ({q_obj.title if q_obj else ''}) done by {self.name}. {desc}")
                 return True, f"Opt obj '{opt_id}' for '{q_id}' done."
             return False, f"Opt obj '{opt_id}' already done."
         return False, f"Quest '{q_id}' not active."
+    def has_completed_quest(self,q_id:str)->bool: return q_id in self._completed_quests_set
     def complete_quest(self,q_id:str)->tuple[bool,str]:
         if q_id in self.active_quests:
             del self.active_quests[q_id]
-            if q_id not in self.completed_quests: self.completed_quests.append(q_id)
+            if q_id not in self._completed_quests_set: self.completed_quests.append(q_id); self._completed_quests_set.add(q_id)
             q_obj=ALL_QUESTS.get(q_id); desc=f"Quest '{q_id}' done by {self.name}!"
             if q_obj and q_obj.description: desc=f"Player {self.name} completed: {q_obj.title}! {q_obj.description}"
             notify_dm(desc)
             return True, f"Quest '{q_id}' completed."
         return False, f"Quest '{q_id}' not active/already done."
     
-    def change_faction_reputation(self, faction_id: str, amount: int, game_state: 'GameState'):
+    def change_faction_reputation(self, faction_id: str, amount: int, game_state: 'GameState', notify: bool = True) -> str | None:
         """
         Change the player's reputation with a specific faction.
         
@@ -375,18 +465,20 @@ class Player(Character):
             faction_id: The ID of the faction
             amount: The amount to change the reputation by (can be positive or negative)
             game_state: The game state object to access faction data
+            notify: Send the change to the DM now. apply_rewards passes False and sends its changes in one notification.
+
+        Returns:
+            The DM message describing the change, or None when DM notifications are disabled.
         """
-        if not hasattr(self, 'faction_reputations'):
-            self.faction_reputations = {}
-        
-        current_rep = self.faction_reputations.get(faction_id, 0)
-        new_rep = current_rep + amount
-        self.faction_reputations[faction_id] = new_rep
+        reps = self.faction_reputations
+        new_rep = reps[faction_id] = reps.get(faction_id, 0) + amount
         
+        if not notify_dm.enabled: return None
         faction = game_state.factions.get(faction_id)
         faction_name = faction.name if faction else faction_id
-        
-        notify_dm(f"{self.name}'s reputation with {faction_name} changed by {amount} (now {new_rep})")
+        message = f"{self.name}'s reputation with {faction_name} changed by {amount} (now {new_rep})"
+        if notify: notify_dm(message)
+        return message
 
 class NPC(Character):
     def __init__(self, id: str, name: str, max_hp: int, combat_stats: dict, base_damage_dice: str,
@@ -421,8 +513,11 @@ class GameState:
         self.world_data: dict = {} # Legacy, might merge with game_objects or specific RAG docs
         self.world_variables: dict = {}
         self.participants_in_combat: list[Character] = []
+        self.participants_by_id: dict[str, Character] = {} # Lookup tables over participants_in_combat, built by start_combat
+        self.participants_by_lower_name: dict[str, Character] = {}
         self.current_turn_character_id: str | None = None
         self.turn_order: list[str] = []
+        self.current_turn_index: int = 0 # Position of current_turn_character_id in turn_order
         self.is_in_combat = False
         self.current_dialogue_npc_id: str | None = None
         self.current_dialogue_key: str | None = "greetings"
@@ -473,7 +568,7 @@ class GameState:
                 if current_location_id and current_location_id == event_data["location_id"]:
                     condition_met = True
             elif condition_type == "quest_completed":
-                if event_data["quest_id"] in self.player_character.completed_quests:
+                if self.player_character.has_completed_quest(event_data["quest_id"]):
                     condition_met = True
             elif condition_type == "turn_count_reached":
                 # turn_count attribute will be added in a later step (step 7)
@@ -781,7 +876,9 @@ class GameState:
     def remove_from_inventory(self, item_id: str) -> bool: return self.player_character.remove_from_inventory(item_id)
     def get_status(self) -> str:
         pc = self.player_character; inv_names = []
-        for item_id in pc.inventory: item_obj=self.items.get(item_id); inv_names.append(item_obj.name if item_obj else item_id)
+        for item_id,count in pc.inventory.items():
+            item_obj=self.items.get(item_id); name=item_obj.name if item_obj else item_id
+            inv_names.append(f"{name} x{count}" if count>1 else name)
         inv_s = ', '.join(inv_names) if inv_names else "empty"
         return f"Player: {pc.name}, HP: {pc.current_hp}/{pc.max_hp}, Inv: [{inv_s}]"
 
@@ -831,11 +928,11 @@ class GameState:
             notify_dm("\n".join(dm_message_parts))
         return monster
 
-def determine_initiative(participants:list[Character])->list[str]:
+def roll_initiative(participants:list[Character])->list[Character]:
+    """Rolls initiative once per participant and returns the participants in turn order (highest first)."""
     if not participants: return []
-    rolls=[{'id':p.id,'initiative':roll_dice(20)+p.combat_stats.get('initiative_bonus',0)} for p in participants]
-    rolls.sort(key=lambda x:x['initiative'],reverse=True)
-    return [e['id'] for e in rolls]
+    return sorted(participants,key=lambda p:_roll_d20()+p.combat_stats.get('initiative_bonus',0),reverse=True) # key runs once per item
+def determine_initiative(participants:list[Character])->list[str]: return [p.id for p in roll_initiative(participants)] # Id-only form
 
 def player_buys_item(player:Player,npc:NPC,item_id:str,game_state:GameState)->tuple[bool,str]:
     """
@@ -854,11 +951,11 @@ def player_buys_item(player:Player,npc:NPC,item_id:str,game_state:GameState)->tu
     if not item: return False, f"Item ID '{item_id}' not found."
     price=item.value.get("buy") if item.value else 0
     if price is None or price<=0: return False, f"Item '{item.name}' no buy price/not buyable."
-    gold=player.equipment.get("currency",{}).get("gold",0)
+    gold=player.currency[GOLD]
     if gold<price: return False, f"'{item.name}' needs {price} gold, has {gold}."
     if not player.change_currency(gold_d=-price): return False, "Currency error." # Fixed gold_delta to gold_d
     player.add_to_inventory(item_id)
-    new_gold=player.equipment.get("currency",{}).get("gold",0)
+    new_gold=player.currency[GOLD]
     notify_dm(f"{player.name} bought {item.name} from {npc.name} for {price} gold. Gold left: {new_gold}.")
     return True, f"Bought '{item.name}' for {price} gold."
 
@@ -884,7 +981,7 @@ def player_sells_item(player:Player,npc:NPC,item_id:str,game_state:GameState)->t
     if price is None or price<=0: return False, f"Item '{item.name}' no sell price/not sellable."
     if not player.remove_from_inventory(item_id): return False, f"'{item.name}' remove fail."
     if not player.change_currency(gold_d=price): player.add_to_inventory(item_id); return False, f"'{item.name}' sell currency error." # Fixed gold_delta to gold_d
-    new_gold=player.equipment.get("currency",{}).get("gold",0)
+    new_gold=player.currency[GOLD]
     notify_dm(f"{player.name} sold {item.name} to {npc.name} for {price} gold. Gold now: {new_gold}.")
     return True, f"Sold '{item.name}' for {price} gold."
 
@@ -1006,8 +1103,8 @@ if __name__ == '__main__':
     # --- Test Item Interactions (using items loaded from files) ---
     print("\n--- Item Interaction Test (Loaded Data) ---")
     # Player starts with "iron_sword" equipped (defined in hero_data, loaded from iron_sword.json)
-    weapon_stats = player.get_equipped_weapon_stats(game)
-    print(f"Equipped weapon ('iron_sword') stats: {weapon_stats}")
+    dmg_dice, wp_atk, wp_dmg = player.get_equipped_weapon_stats(game)
+    print(f"Equipped weapon ('iron_sword') stats: damage {dmg_dice}, attack +{wp_atk}, damage +{wp_dmg}")
 
     # Equip "chainmail_armor" (loaded from chainmail_armor.json)
     player.add_to_inventory("chainmail_armor") # Add its ID to inventory first
@@ -1036,18 +1133,18 @@ if __name__ == '__main__':
         print(f"Trading with: {merchant_npc.name}")
         # Assume 'healing_potion_small' is in merchant's shop_inventory in the JSON
         # Player buys another 'healing_potion_small'
-        print(f"Player gold before buying: {player.equipment.get('currency', {}).get('gold')}")
+        print(f"Player gold before buying: {player.currency[GOLD]}")
         buy_success, buy_msg = player_buys_item(player, merchant_npc, "healing_potion_small", game)
         print(buy_msg)
-        if buy_success: print(f"Player gold after buying: {player.equipment.get('currency', {}).get('gold')}")
+        if buy_success: print(f"Player gold after buying: {player.currency[GOLD]}")
         print(f"Player inventory after buying: {player.inventory}")
 
         # Player sells "old_key" (if they have it and it's sellable, loaded from old_key.json)
         if "old_key" not in player.inventory: player.add_to_inventory("old_key")
-        print(f"\nPlayer gold before selling 'old_key': {player.equipment.get('currency', {}).get('gold')}")
+        print(f"\nPlayer gold before selling 'old_key': {player.currency[GOLD]}")
         sell_success, sell_msg = player_sells_item(player, merchant_npc, "old_key", game)
         print(sell_msg)
-        if sell_success: print(f"Player gold after selling 'old_key': {player.equipment.get('currency', {}).get('gold')}")
+        if sell_success: print(f"Player gold after selling 'old_key': {player.currency[GOLD]}")
     else:
         print("Merchant Jane (npc_merchant_jane) not found in game.npcs. Skipping trade tests.")
 
@@ -1091,11 +1188,11 @@ if __name__ == '__main__':
                 print(f"\nRound {i+1} of combat: Player vs {goblin_target.name} (ID: {goblin_target.id})")
                 print(f"{player.name} (HP: {player.current_hp}) vs {goblin_target.name} (HP: {goblin_target.current_hp})")
 
-                attack_msg_p = player.attack(goblin_target, game)
+                attack_msg_p = player.attack(goblin_target)
                 print(f"Player action: {attack_msg_p}")
 
                 if goblin_target.is_alive():
-                    attack_msg_g = goblin_target.attack(player, game)
+                    attack_msg_g = goblin_target.attack(player)
                     print(f"Goblin action: {attack_msg_g}")
                 else:
                     print(f"{goblin_target.name} was defeated by the player.")
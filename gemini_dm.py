@@ -69,10 +69,18 @@ def notify_dm(message: str) -> None:
     """
     Sends a notification to the Dungeon Master.
     For now, it just prints the message to the console.
+
+    Set ``notify_dm.enabled = False`` to silence notifications (e.g. in batch
+    simulations); callers check the flag before formatting their messages.
     """
+    if not notify_dm.enabled:
+        return
     print(f"DM NOTIFICATION: {message}")
 
 
+notify_dm.enabled = True
+
+
 if __name__ == '__main__':
     # Example usage:
     notify_dm("Player Valerius has entered the Whispering Woods.")
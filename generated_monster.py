@@ -75,7 +75,7 @@ if __name__ == '__main__':
 
     print("\n--- Attack Demo ---")
     print(f"{monster.name} attacks {dummy_target.name} (AC: {dummy_target.combat_stats.get('armor_class')})")
-    attack_result = monster.attack(dummy_target, dummy_game_state)
+    attack_result = monster.attack(dummy_target)
     print(attack_result)
     print(f"{dummy_target.name} HP after attack: {dummy_target.current_hp}/{dummy_target.max_hp}")
 
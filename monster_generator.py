@@ -4,13 +4,17 @@ from generated_monster import GeneratedMonster
 from typing import Any, Dict, List, Optional
 from character import Character
 
+_MISSING = object() # Sentinel so stored None values are still returned as-is
+
 # Helper function to safely get nested dictionary values
 def get_nested_value(data_dict: Dict[str, Any], keys: List[str], default: Any = None) -> Any:
     current = data_dict
     for key in keys:
-        if not isinstance(current, dict) or key not in current:
+        if not isinstance(current, dict):
+            return default
+        current = current.get(key, _MISSING) # One hash lookup instead of `in` followed by indexing
+        if current is _MISSING:
             return default
-        current = current[key]
     return current
 
 class MonsterGenerator:
@@ -20,6 +24,20 @@ class MonsterGenerator:
         self.race_templates = {r['id']: r for r in race_templates}
         self.attribute_templates = {a['id']: a for a in attribute_templates}
         self.role_templates = {r['id']: r for r in role_templates}
+        # tuple(possible tags) -> eligible templates in template order; races reuse the same tag lists on every spawn
+        self._eligible_attributes_by_tags: Dict[tuple, List[Dict[str, Any]]] = {}
+        self._eligible_roles_by_tags: Dict[tuple, List[Dict[str, Any]]] = {}
+
+    @staticmethod
+    def _eligible_templates(templates: Dict[str, Dict[str, Any]], possible_tags: List[str],
+                            cache: Dict[tuple, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        key = tuple(possible_tags)
+        eligible = cache.get(key)
+        if eligible is None:
+            tag_set = set(possible_tags)
+            eligible = [t for t in templates.values() if t['id'] in tag_set]
+            cache[key] = eligible
+        return eligible
 
     def _select_race(self, race_id: Optional[str] = None) -> Dict[str, Any]:
         if race_id and race_id in self.race_templates:
@@ -47,7 +65,7 @@ class MonsterGenerator:
             elif difficulty_level >= 4:
                 num_attributes = random.randint(1, 2)
 
-        eligible_attributes = [attr for attr in self.attribute_templates.values() if attr['id'] in possible_tags]
+        eligible_attributes = self._eligible_templates(self.attribute_templates, possible_tags, self._eligible_attributes_by_tags)
         if not eligible_attributes:
              eligible_attributes = list(self.attribute_templates.values())
 
@@ -64,7 +82,7 @@ class MonsterGenerator:
         if not possible_tags:
             return random.choice(list(self.role_templates.values())) if self.role_templates else None
 
-        eligible_roles = [role for role in self.role_templates.values() if role['id'] in possible_tags]
+        eligible_roles = self._eligible_templates(self.role_templates, possible_tags, self._eligible_roles_by_tags)
         if not eligible_roles:
             return random.choice(list(self.role_templates.values())) if self.role_templates else None
 
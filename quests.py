@@ -5,6 +5,9 @@ class Quest:
         self.description = description
         self.stages = stages
         self.optional_objectives = optional_objectives
+        # ID lookup tables so quest events don't scan the lists
+        self.stages_by_id = {s["stage_id"]: s for s in stages}
+        self.optional_objectives_by_id = {o["objective_id"]: o for o in optional_objectives}
         self.rewards = rewards
 
 # Sample Quest 1
@@ -83,24 +83,35 @@ def get_text_from_doc(doc: dict, text_fields: list[str]) -> str:
     Returns:
         A single string containing all extracted text, joined by spaces.
     """
-    texts = []
     if not isinstance(doc, dict):
         logging.warning(f"Document is not a dictionary, cannot extract text. Doc: {str(doc)[:100]}")
         return ""
 
-    for field in text_fields:
-        if field == 'dialogue_responses':
+    return " ".join(_iter_doc_texts(doc, _compile_text_fields(text_fields))).strip()
+
+
+def _compile_text_fields(text_fields: list[str]) -> tuple[tuple[str, bool], ...]:
+    """Pairs each text field with whether it is the special 'dialogue_responses' field, so callers can classify once per batch."""
+    return tuple((field, field == 'dialogue_responses') for field in text_fields)
+
+
+def _iter_doc_texts(doc: dict, compiled_fields: tuple[tuple[str, bool], ...]):
+    """Yields the non-empty text pieces of `doc` for get_text_from_doc, so no intermediate list is built."""
+    for field, is_dialogue in compiled_fields:
+        if is_dialogue:
             dialogue_data = doc.get(field)
             if isinstance(dialogue_data, dict):
-                for _node_key, node_content in dialogue_data.items():
+                for node_content in dialogue_data.values():
                     if isinstance(node_content, dict) and 'npc_text' in node_content:
-                        texts.append(str(node_content['npc_text']))
+                        text = str(node_content['npc_text'])
+                        if text:
+                            yield text
         else:
             field_value = doc.get(field)
             if field_value is not None:
-                texts.append(str(field_value))
-
-    return " ".join(filter(None, texts)).strip()
+                text = str(field_value)
+                if text:
+                    yield text
 
 
 def initialize_vector_db(
@@ -137,6 +148,8 @@ def initialize_vector_db(
     documents_to_add = [] # Text that was embedded
 
     total_docs_processed = 0
+    skipped_no_text = [] # unique_ids; reported in one warning after the loop instead of one per document
+    compiled_fields = _compile_text_fields(text_fields) # Classified once, not per document
     for category_name, docs_list in all_raw_data.items():
         logging.info(f"Processing category: {category_name} ({len(docs_list)} documents)")
         for idx, doc_dict in enumerate(docs_list):
@@ -147,9 +160,9 @@ def initialize_vector_db(
             doc_id_val = doc_dict.get('id', f"missingid_{idx}")
             unique_id = f"{category_name}_{doc_id_val}"
 
-            text_for_embedding = get_text_from_doc(doc_dict, text_fields)
+            text_for_embedding = " ".join(_iter_doc_texts(doc_dict, compiled_fields)).strip()
             if not text_for_embedding:
-                logging.warning(f"No text extracted for document ID '{unique_id}' in category '{category_name}'. Skipping.")
+                skipped_no_text.append(unique_id)
                 continue
 
             try:
@@ -171,6 +184,9 @@ def initialize_vector_db(
             documents_to_add.append(text_for_embedding) # Store the text that was actually embedded
             total_docs_processed += 1
 
+    if skipped_no_text:
+        logging.warning(f"No text extracted for {len(skipped_no_text)} document(s), skipped: {', '.join(skipped_no_text)}")
+
     if doc_ids_to_add:
         try:
             logging.info(f"Adding {len(doc_ids_to_add)} documents to ChromaDB collection '{collection_name}'...")
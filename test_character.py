@@ -0,0 +1,71 @@
+import unittest
+import sys
+import os
+import random
+
+# Add project root to sys.path to allow importing character, etc.
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '.'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from character import Character
+
+
+def make_character(**combat_stats) -> Character:
+    stats = {"armor_class": 10, "attack_bonus": 0, "damage_bonus": 0}
+    stats.update(combat_stats)
+    return Character("hero", "Hero", 20, stats, "1d6")
+
+
+class TestStatusEffectTick(unittest.TestCase):
+    def test_tick_only_counts_down_durations(self):
+        character = make_character()
+        character.take_damage(5)
+        character.add_status_effect("poison", duration=2, potency=3)
+        character.add_status_effect("regeneration", duration=1, potency=4)
+
+        self.assertEqual(character.tick_status_effects(), [])
+        self.assertEqual(character.current_hp, 15)
+        self.assertEqual(set(character.status_effects), {"poison"})
+        self.assertEqual(character.status_effects["poison"].duration, 1)
+
+        self.assertEqual(character.tick_status_effects(), [])
+        self.assertEqual(character.current_hp, 15)
+        self.assertEqual(character.status_effects, {})
+
+
+class TestAttackMessage(unittest.TestCase):
+    def setUp(self):
+        self.target = Character("goblin1", "Goblin", 20, {"armor_class": 10}, "1d4")
+
+    def test_hit_returns_attack_message(self):
+        event = make_character(attack_bonus=50, damage_bonus=2).attack(self.target)
+        self.assertTrue(event.hit)
+        self.assertEqual(str(event), f"Hero attacks Goblin for {event.damage} damage.")
+        self.assertIn("attacks", event)
+        self.assertNotIn("misses", event)
+        self.assertEqual(self.target.current_hp, 20 - event.damage)
+
+    def test_miss_returns_miss_message(self):
+        event = make_character(attack_bonus=-50).attack(self.target)
+        self.assertFalse(event.hit)
+        self.assertEqual(str(event), "Hero's attack misses Goblin.")
+        self.assertIn("misses", event)
+        self.assertEqual(self.target.current_hp, 20)
+
+    def test_negative_damage_bonus_never_heals(self):
+        attacker = make_character(attack_bonus=50, damage_bonus=-100)
+        self.target.take_damage(5)
+        event = attacker.attack(self.target)
+        self.assertTrue(event.hit)
+        self.assertEqual(event.damage, 0)
+        self.assertEqual(self.target.current_hp, 15)
+
+        hit, damage = attacker.fast_attack(self.target, random.Random(7))
+        self.assertTrue(hit)
+        self.assertEqual(damage, 0)
+        self.assertEqual(self.target.current_hp, 15)
+
+
+if __name__ == '__main__':
+    unittest.main()
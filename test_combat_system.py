@@ -0,0 +1,50 @@
+import unittest
+import sys
+import os
+
+# Add project root to sys.path to allow importing combat_system, game_state, etc.
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '.'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from game_state import Player, NPC, PlayerState
+from combat_system import start_combat, check_combat_end_condition
+
+
+class TestCombatEndCondition(unittest.TestCase):
+    def setUp(self):
+        self.player = Player({
+            "id": "hero", "name": "Hero", "max_hp": 30,
+            "combat_stats": {"armor_class": 12, "attack_bonus": 50, "damage_bonus": 100},
+            "base_damage_dice": "1d4"
+        })
+        self.npc = NPC("goblin1", "Goblin", 5, {"armor_class": 10}, "1d4")
+        self.state = PlayerState(player_character=self.player)
+        start_combat(self.player, [self.npc], self.state)
+
+    def test_combat_continues_while_npc_alive(self):
+        ended, message = check_combat_end_condition(self.player, [self.npc], self.state)
+        self.assertFalse(ended)
+        self.assertEqual(message, "")
+        self.assertTrue(self.state.is_in_combat)
+
+    def test_combat_ends_when_npc_killed_outside_process_combat_turn(self):
+        # attack() is called directly, so combat_system never sees the kill
+        self.player.attack(self.npc)
+        self.assertFalse(self.npc.is_alive())
+
+        ended, message = check_combat_end_condition(self.player, [self.npc], self.state)
+        self.assertTrue(ended)
+        self.assertIn("defeated! Combat ends.", message)
+        self.assertFalse(self.state.is_in_combat)
+        self.assertEqual(self.state.turn_order, [])
+
+    def test_combat_ends_when_player_defeated(self):
+        self.player.take_damage(self.player.max_hp)
+        ended, message = check_combat_end_condition(self.player, [self.npc], self.state)
+        self.assertTrue(ended)
+        self.assertIn("Player Hero (hero) has been defeated!", message)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+import sys
+import os
+import json
+import tempfile
+
+# Add project root to sys.path to allow importing data_loader, etc.
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '.'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import data_loader
+from data_loader import load_raw_data_from_sources, clear_parse_cache
+
+
+class TestParseCache(unittest.TestCase):
+    def setUp(self):
+        clear_parse_cache()
+        self.addCleanup(clear_parse_cache)
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.source = os.path.join(tmp_dir.name, "NPCs")
+        os.mkdir(self.source)
+        self.npc_path = os.path.join(self.source, "guard.json")
+        self.write_npc({"name": "Guard"}, mtime_ns=1_000_000_000)
+
+    def write_npc(self, data: dict, mtime_ns: int):
+        with open(self.npc_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.utime(self.npc_path, ns=(mtime_ns, mtime_ns)) # Explicit mtimes, so fast rewrites never share a timestamp
+
+    def load_guard(self) -> dict:
+        npcs = load_raw_data_from_sources((self.source,), use_cache=True)["NPCs"]
+        self.assertEqual(len(npcs), 1)
+        return npcs[0]
+
+    def test_unchanged_file_is_served_from_cache(self):
+        first = self.load_guard()
+        self.assertEqual(first, {"name": "Guard", "id": "guard"})
+        self.assertIs(self.load_guard(), first)
+
+    def test_modified_file_is_parsed_again(self):
+        first = self.load_guard()
+        self.write_npc({"name": "Captain"}, mtime_ns=2_000_000_000)
+        second = self.load_guard()
+        self.assertIsNot(second, first)
+        self.assertEqual(second["name"], "Captain")
+        self.assertEqual(len(data_loader._PARSE_CACHE), 1) # The edit replaced the old entry instead of adding one
+
+    def test_same_mtime_different_size_is_parsed_again(self):
+        self.load_guard()
+        self.write_npc({"name": "Guard Captain"}, mtime_ns=1_000_000_000)
+        self.assertEqual(self.load_guard()["name"], "Guard Captain")
+
+    def test_clear_parse_cache_forces_a_fresh_parse(self):
+        first = self.load_guard()
+        clear_parse_cache()
+        second = self.load_guard()
+        self.assertIsNot(second, first)
+        self.assertEqual(second, first)
+
+    def test_uncached_loads_return_fresh_objects(self):
+        cached = self.load_guard()
+        uncached = load_raw_data_from_sources((self.source,))["NPCs"][0]
+        self.assertIsNot(uncached, cached)
+        self.assertEqual(uncached, cached)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+import unittest
+import sys
+import os
+from types import SimpleNamespace
+
+# Add project root to sys.path to allow importing game_state, etc.
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '.'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from game_state import Player, Consumable
+from utils import PROFICIENCY_BONUS
+
+
+def make_player_data(**overrides) -> dict:
+    data = {
+        "id": "hero", "name": "Hero", "max_hp": 30,
+        "combat_stats": {"armor_class": 12, "attack_bonus": 2, "damage_bonus": 1},
+        "base_damage_dice": "1d6",
+    }
+    data.update(overrides)
+    return data
+
+
+class TestPlayerEquipment(unittest.TestCase):
+    def test_equipment_view_round_trips_slots_and_currency(self):
+        player = Player(make_player_data(equipment={
+            "weapon": "iron_sword", "helmet": "leather_cap",
+            "currency": {"gold": 12, "silver": 3, "copper": 7}
+        }))
+        saved_equipment = player.equipment
+        self.assertEqual(saved_equipment["currency"], {"gold": 12, "silver": 3, "copper": 7})
+
+        reloaded = Player(make_player_data(equipment=saved_equipment))
+        self.assertEqual(reloaded.currency, [12, 3, 7])
+        self.assertEqual(reloaded.weapon_id, "iron_sword")
+        self.assertIsNone(reloaded.armor_id)
+        self.assertEqual(reloaded.equipment, saved_equipment)
+
+    def test_equipment_view_rejects_in_place_edits(self):
+        player = Player(make_player_data(equipment={"currency": {"gold": 1}}))
+        with self.assertRaises(TypeError):
+            player.equipment["weapon"] = "iron_sword"
+        with self.assertRaises(TypeError):
+            player.equipment["currency"]["gold"] = 99
+        self.assertIsNone(player.weapon_id)
+        self.assertEqual(player.currency, [1, 0, 0])
+
+
+class TestPlayerSpellSlots(unittest.TestCase):
+    def test_spell_slots_round_trip_in_template_format(self):
+        slots = {"level_1": {"current": 2, "maximum": 4}, "level_3": {"current": 1, "maximum": 1}}
+        player = Player(make_player_data(spell_slots=slots))
+        self.assertTrue(player.try_consume_spell_slot(1))
+        self.assertEqual(player.spell_slots, {"level_1": {"current": 1, "maximum": 4}, "level_3": {"current": 1, "maximum": 1}})
+        reloaded = Player(make_player_data(spell_slots=player.spell_slots))
+        self.assertEqual(reloaded.spell_slots, player.spell_slots)
+
+    def test_spell_slots_view_rejects_in_place_edits(self):
+        player = Player(make_player_data(spell_slots={"level_1": {"current": 2, "maximum": 2}}))
+        with self.assertRaises(TypeError):
+            player.spell_slots["level_1"]["current"] -= 1
+        self.assertEqual(player.spell_slot_current[1], 2)
+
+
+class TestPlayerCurrency(unittest.TestCase):
+    def test_currency_round_trips_through_dict_view(self):
+        player = Player(make_player_data(equipment={"currency": {"gold": 4, "silver": 2}}))
+        self.assertEqual(player.currency, [4, 2, 0])
+        self.assertTrue(player.change_currency(gold_d=-1, silver_d=3, copper_d=5))
+        self.assertEqual(player.currency_dict, {"gold": 3, "silver": 5, "copper": 5})
+        reloaded = Player(make_player_data(equipment={"currency": player.currency_dict}))
+        self.assertEqual(reloaded.currency, player.currency)
+
+    def test_cannot_spend_more_gold_than_held(self):
+        player = Player(make_player_data(equipment={"currency": {"gold": 2}}))
+        self.assertFalse(player.change_currency(gold_d=-3, silver_d=10))
+        self.assertEqual(player.currency, [2, 0, 0])
+
+    def test_currency_rewards_add_to_the_right_coin(self):
+        player = Player(make_player_data())
+        player.apply_rewards({"currency": {"silver": 7, "platinum": 1, "copper": -2}}, SimpleNamespace(factions={}))
+        self.assertEqual(player.currency_dict, {"gold": 0, "silver": 7, "copper": 0})
+
+
+class TestPlayerInventory(unittest.TestCase):
+    def test_duplicates_are_counted(self):
+        player = Player(make_player_data(inventory=["potion", "potion", "rope"]))
+        self.assertEqual(player.inventory["potion"], 2)
+        player.add_to_inventory("potion")
+        player.add_to_inventory("torch")
+        self.assertEqual(player.inventory, {"potion": 3, "rope": 1, "torch": 1})
+
+    def test_remove_drops_item_at_zero(self):
+        player = Player(make_player_data(inventory=["potion", "potion"]))
+        self.assertTrue(player.remove_from_inventory("potion"))
+        self.assertIn("potion", player.inventory)
+        self.assertTrue(player.remove_from_inventory("potion"))
+        self.assertNotIn("potion", player.inventory)
+        self.assertFalse(player.remove_from_inventory("potion"))
+        self.assertNotIn("potion", player.inventory) # A failed removal must not leave a zero entry behind
+
+    def test_invalid_item_ids_raise(self):
+        player = Player(make_player_data())
+        with self.assertRaises(TypeError):
+            player.add_to_inventory(5)
+        with self.assertRaises(ValueError):
+            player.add_to_inventory("  ")
+        with self.assertRaises(TypeError):
+            player.remove_from_inventory(None)
+
+
+class TestPlayerSkillChecks(unittest.TestCase):
+    def test_in_place_edits_to_scores_and_proficiencies_apply(self):
+        player = Player(make_player_data(ability_scores={"intelligence": 10}))
+        _, roll, total, _ = player.perform_skill_check("investigation", 10)
+        self.assertEqual(total, roll)
+
+        player.ability_scores["intelligence"] = 16
+        player.proficiencies_map["skills"].append("investigation")
+        self.assertEqual(player.get_ability_modifier("intelligence"), 3)
+        _, roll, total, _ = player.perform_skill_check("investigation", 10)
+        self.assertEqual(total, roll + 3 + PROFICIENCY_BONUS)
+
+
+class TestPlayerRewards(unittest.TestCase):
+    def test_faction_rep_changes_go_through_change_faction_reputation(self):
+        player = Player(make_player_data(faction_reputations={"guild": 5}))
+        game_state = SimpleNamespace(factions={})
+        player.apply_rewards({"faction_rep_changes": [
+            {"faction_id": "guild", "amount": 3}, {"faction_id": "crown", "amount": -2}, {"faction_id": "crown"}
+        ]}, game_state)
+        self.assertEqual(player.faction_reputations, {"guild": 8, "crown": -2})
+
+
+class TestPlayerUseItem(unittest.TestCase):
+    def test_flat_negative_heal_amount_heals_nothing(self):
+        player = Player(make_player_data(inventory=["bad_tonic"]))
+        player.take_damage(10)
+        tonic = Consumable("bad_tonic", "Bad Tonic", "Tastes off.", [{"effect_type": "heal", "amount": "-1"}])
+        success, message = player.use_item("bad_tonic", SimpleNamespace(items={"bad_tonic": tonic}))
+        self.assertTrue(success)
+        self.assertIn("healed for 0 HP", message)
+        self.assertNotIn("Invalid amount format", message)
+        self.assertEqual(player.current_hp, 20)
+
+
+if __name__ == '__main__':
+    unittest.main()
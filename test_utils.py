@@ -0,0 +1,60 @@
+import unittest
+import sys
+import os
+import random
+
+# Add project root to sys.path to allow importing utils, etc.
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '.'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from utils import get_dice_pool, seed_dice, DicePool, parse_dice
+
+
+class TestParseDice(unittest.TestCase):
+    def test_dice_expressions(self):
+        self.assertEqual(parse_dice("2d6"), (2, 6, 0))
+        self.assertEqual(parse_dice("d8"), (1, 8, 0))
+        self.assertEqual(parse_dice("1d10+2"), (1, 10, 2))
+        self.assertEqual(parse_dice(" 2D4 - 1 "), (2, 4, -1))
+
+    def test_flat_amounts(self):
+        self.assertEqual(parse_dice("5"), (0, 0, 5))
+        self.assertEqual(parse_dice("-1"), (0, 0, -1))
+        self.assertEqual(parse_dice("+3"), (0, 0, 3))
+        self.assertEqual(parse_dice("0"), (0, 0, 0))
+
+    def test_malformed_expressions_raise(self):
+        for expr in ("", "d", "2d", "0d6", "2d0", "1d6+", "abc", "1.5", "2d6+1d4", "--1"):
+            with self.subTest(expr=expr):
+                with self.assertRaises(ValueError):
+                    parse_dice(expr)
+
+
+class TestDicePoolSeeding(unittest.TestCase):
+    def test_seed_dice_makes_pooled_rolls_reproducible(self):
+        pool = get_dice_pool(20)
+        pool.next()  # Leave a partly used buffer behind, as a running game would
+        seed_dice(1234)
+        first = [pool.next() for _ in range(10)]
+        seed_dice(1234)
+        second = [pool.next() for _ in range(10)]
+        self.assertEqual(first, second)
+
+    def test_clear_discards_buffered_rolls(self):
+        pool = DicePool(6, size=8)
+        random.seed(99)
+        expected = [pool.next() for _ in range(3)]
+        pool.next()
+        random.seed(99)
+        pool.clear()
+        self.assertEqual([pool.next() for _ in range(3)], expected)
+
+    def test_rolls_stay_in_range_across_refills(self):
+        pool = DicePool(4, size=3)
+        rolls = [pool.next() for _ in range(50)]
+        self.assertTrue(all(1 <= r <= 4 for r in rolls))
+
+
+if __name__ == '__main__':
+    unittest.main()
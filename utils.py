@@ -1,5 +1,7 @@
 # utils.py
+import functools
 import random
+import re
 
 # Mapping of skills to their primary ability scores
 SKILL_ABILITY_MAP = {
@@ -38,6 +40,37 @@ ABILITY_ABBREVIATIONS = {
     "charisma": "CHA",
 }
 
+_DICE_RE = re.compile(r'^\s*(?:(\d*)d(\d+)\s*(?:([+-])\s*(\d+))?|([+-]?\d+))\s*$', re.IGNORECASE)
+
+@functools.lru_cache(maxsize=512)
+def parse_dice(expr: str) -> tuple[int, int, int]:
+    """
+    Parses a dice expression such as "2d6", "d8", "1d10+2", "2d4-1" or a flat "5" / "-1".
+
+    Results are cached, so repeated expressions (weapon dice, potion amounts) are parsed once.
+
+    Args:
+        expr: The dice expression.
+
+    Returns:
+        A (num_dice, sides, modifier) tuple. Flat numbers return (0, 0, value).
+
+    Raises:
+        ValueError: If the expression is malformed or has a zero dice count or side count.
+    """
+    match = _DICE_RE.match(expr)
+    if not match:
+        raise ValueError(f"Invalid dice expression: '{expr}'")
+    num_str, sides_str, sign, mod_str, flat_str = match.groups()
+    if flat_str is not None:
+        return 0, 0, int(flat_str)
+    num_dice = int(num_str) if num_str else 1
+    sides = int(sides_str)
+    if num_dice <= 0 or sides <= 0:
+        raise ValueError(f"Dice count and sides must be positive: '{expr}'")
+    modifier = int(mod_str) if mod_str else 0
+    return num_dice, sides, -modifier if sign == '-' else modifier
+
 def roll_dice(sides: int, num_dice: int = 1) -> int:
     """
     Simulates rolling one or more dice with a specified number of sides.
@@ -60,7 +93,68 @@ def roll_dice(sides: int, num_dice: int = 1) -> int:
     if num_dice <= 0:
         raise ValueError("Number of dice to roll must be positive.")
 
-    total_roll = 0
-    for _ in range(num_dice):
-        total_roll += random.randint(1, sides)
-    return total_roll
+    if num_dice >= 4:
+        # One random.choices() call draws every die at once; cheaper than a randint() per die
+        return sum(random.choices(range(1, sides + 1), k=num_dice))
+    randint = random.randint
+    if num_dice == 1:
+        return randint(1, sides)
+    return sum([randint(1, sides) for _ in range(num_dice)])
+
+
+class DicePool:
+    """
+    Pre-rolled buffer of results for a single die size.
+
+    random.choices() fills the whole buffer in one call, which is noticeably cheaper
+    per die than calling random.randint() for every roll on hot combat paths.
+
+    Because rolls are drawn ahead of time, random.seed() alone does not affect rolls
+    already sitting in a buffer; use seed_dice() to reseed and discard them together.
+    """
+    __slots__ = ('_faces', '_size', '_it')
+
+    def __init__(self, sides: int, size: int = 4096):
+        if not isinstance(sides, int) or sides <= 0:
+            raise ValueError("Number of sides must be a positive integer.")
+        self._faces = range(1, sides + 1)
+        self._size = size
+        self._it = iter(())  # Filled lazily on the first roll
+
+    def clear(self) -> None:
+        """Discards any buffered rolls so the next roll draws from the current random state."""
+        self._it = iter(())
+
+    def next(self) -> int:
+        """Returns the next roll from the buffer, refilling it when exhausted."""
+        # A list iterator hands each element out exactly once even when several threads share it;
+        # a concurrent refill at worst discards one fresh buffer.
+        try:
+            return next(self._it)
+        except StopIteration:
+            it = iter(random.choices(self._faces, k=self._size))
+            self._it = it
+            return next(it)
+
+
+_DICE_POOLS: dict[int, DicePool] = {}
+
+def get_dice_pool(sides: int) -> DicePool:
+    """Returns the shared DicePool for the given die size, creating it on first use."""
+    pool = _DICE_POOLS.get(sides)
+    if pool is None:
+        pool = _DICE_POOLS.setdefault(sides, DicePool(sides))
+    return pool
+
+def seed_dice(seed=None) -> None:
+    """
+    Seeds the random module and discards every pre-rolled DicePool buffer.
+
+    Use this instead of random.seed() when attack, initiative or check rolls must be reproducible.
+
+    Args:
+        seed: Any value accepted by random.seed(). None seeds from system entropy.
+    """
+    random.seed(seed)
+    for pool in list(_DICE_POOLS.values()):
+        pool.clear()